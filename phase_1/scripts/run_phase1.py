@@ -2,10 +2,11 @@
 Main script to run Phase 1: Data scraping and preprocessing.
 Updated version with modular architecture.
 """
+import inspect
 import sys
-import json
 from pathlib import Path
 from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
@@ -15,6 +16,38 @@ from parsers.curriculum_parser import CurriculumParser
 from parsers.instructor_parser import InstructorParser
 from parsers.tools_parser import ToolsParser
 from parsers.general_parser import GeneralParser
+from utils.json_utils import write_json
+from utils.parse_cache import cached_parse
+
+
+# Parser workers: each runs in its own process and writes its own output file;
+# results for unchanged input and parser code come from the parse cache
+def _run_curriculum(text):
+    parser = CurriculumParser()
+    curriculum = cached_parse("curriculum", text, parser.parse_from_text, inspect.getfile(CurriculumParser))
+    parser.save_to_json(curriculum, "data/processed/curriculum.json")
+    return curriculum
+
+
+def _run_instructors(html):
+    parser = InstructorParser()
+    instructors = cached_parse("instructors", html, parser.parse, inspect.getfile(InstructorParser))
+    parser.save_to_json(instructors, "data/processed/instructors.json")
+    return instructors
+
+
+def _run_tools(text):
+    parser = ToolsParser()
+    tools = cached_parse("tools", text, parser.parse_from_text, inspect.getfile(ToolsParser))
+    parser.save_to_json(tools, "data/processed/tools.json")
+    return tools
+
+
+def _run_general(text):
+    parser = GeneralParser()
+    general_info = cached_parse("general_info", text, parser.parse, inspect.getfile(GeneralParser))
+    parser.save_to_json(general_info, "data/processed/general_info.json")
+    return general_info
 
 
 def main():
@@ -40,6 +73,7 @@ def main():
     
     # Fetch HTML
     html = scraper.fetch_page()
+    scraper.close()
     if not html:
         print("[X] Scraping failed")
         return
@@ -55,27 +89,31 @@ def main():
     })
     print()
     
-    # Step 2: Parse curriculum
-    print("Step 2: Parsing curriculum...")
+    # Parse from the in-memory scrape; the files above are kept for CLI reuse
+    raw_text = data['full_text']
+    
+    # Steps 2-5 are independent, so run the parsers concurrently
+    print("Steps 2-5: Parsing curriculum, instructors, tools and program info...")
     print("-" * 70)
-    curriculum_parser = CurriculumParser()
-    curriculum = curriculum_parser.parse_from_file("data/raw/scraped_content.json")
-    curriculum_parser.save_to_json(curriculum, "data/processed/curriculum.json")
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        fut_curriculum = executor.submit(_run_curriculum, raw_text)
+        fut_instructors = executor.submit(_run_instructors, html)
+        fut_tools = executor.submit(_run_tools, raw_text)
+        fut_general = executor.submit(_run_general, raw_text)
+        curriculum = fut_curriculum.result()
+        instructors = fut_instructors.result()
+        tools = fut_tools.result()
+        general_info = fut_general.result()
+    print()
     
+    # Step 2: Curriculum
     metadata['steps'].append({
         "step": "curriculum_parsing",
         "status": "success",
         "weeks_found": curriculum['total_weeks']
     })
-    print()
-    
-    # Step 3: Parse instructors (IMPROVED - using HTML)
-    print("Step 3: Parsing instructors (improved - from HTML)...")
-    print("-" * 70)
-    instructor_parser = InstructorParser()
-    instructors = instructor_parser.parse_from_file("data/raw/course_page.html")
-    instructor_parser.save_to_json(instructors, "data/processed/instructors.json")
     
+    # Step 3: Instructors (IMPROVED - using HTML)
     print(f"[INFO] Found {len(instructors)} instructors:")
     for inst in instructors:
         print(f"  - {inst['name']}: {inst.get('teaches', 'N/A')}")
@@ -85,29 +123,15 @@ def main():
         "status": "success",
         "instructors_found": len(instructors)
     })
-    print()
-    
-    # Step 4: Parse tools
-    print("Step 4: Parsing tools and technologies...")
-    print("-" * 70)
-    tools_parser = ToolsParser()
-    tools = tools_parser.parse_from_file("data/raw/scraped_content.json")
-    tools_parser.save_to_json(tools, "data/processed/tools.json")
     
+    # Step 4: Tools
     metadata['steps'].append({
         "step": "tools_parsing",
         "status": "success",
         "categories_found": len(tools)
     })
-    print()
-    
-    # Step 5: Parse general information (ENHANCED)
-    print("Step 5: Parsing comprehensive program information...")
-    print("-" * 70)
-    general_parser = GeneralParser()
-    general_info = general_parser.parse_from_file("data/raw/scraped_content.json")
-    general_parser.save_to_json(general_info, "data/processed/general_info.json")
     
+    # Step 5: General information (ENHANCED)
     # Display extracted info
     print("[INFO] Program details extracted:")
     if 'program_details' in general_info:
@@ -133,11 +157,7 @@ def main():
     metadata['completed_at'] = datetime.now().isoformat()
     metadata['status'] = 'success'
     
-    metadata_path = Path("data/metadata/phase1_log.json")
-    metadata_path.parent.mkdir(parents=True, exist_ok=True)
-    
-    with open(metadata_path, 'w') as f:
-        json.dump(metadata, f, indent=2)
+    write_json(metadata, "data/metadata/phase1_log.json")
     
     # Print summary
     print("\n" + "="*70)
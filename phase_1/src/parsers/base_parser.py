@@ -1,10 +1,20 @@
 """
 Base parser class with common functionality.
 """
-import json
+import re
 from typing import Dict, Any
 from abc import ABC, abstractmethod
 
+from utils.json_utils import load_json_file, write_json
+
+_WS_RE = re.compile(r'\s+')
+# Special characters to drop (keeps basic punctuation)
+_DISALLOWED_RE = re.compile(r'[^\w\s\-:.,!?()&\n]')
+# Same filter as a translate table for the common all-ASCII case
+_ASCII_DELETE = str.maketrans('', '', ''.join(
+    c for c in map(chr, range(128)) if _DISALLOWED_RE.match(c)
+))
+
 
 class BaseParser(ABC):
     """Abstract base class for all parsers."""
@@ -19,24 +29,22 @@ class BaseParser(ABC):
     
     def load_from_file(self, file_path: str) -> str:
         """Load content from file."""
+        if file_path.endswith('.json'):
+            data = load_json_file(file_path)
+            return data.get('full_text', '')
         with open(file_path, 'r', encoding='utf-8') as f:
-            if file_path.endswith('.json'):
-                data = json.load(f)
-                return data.get('full_text', '')
-            else:
-                return f.read()
+            return f.read()
     
     def save_to_json(self, data: Dict, output_path: str) -> None:
         """Save parsed data to JSON file."""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(data, output_path)
         print(f"[OK] Saved data to {output_path}")
     
     def clean_text(self, text: str) -> str:
         """Clean and normalize text."""
-        import re
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        text = _WS_RE.sub(' ', text).strip()
         # Remove special characters but keep basic punctuation
-        text = re.sub(r'[^\w\s\-:.,!?()&\n]', '', text)
-        return text
+        if text.isascii():
+            return text.translate(_ASCII_DELETE)
+        return _DISALLOWED_RE.sub('', text)
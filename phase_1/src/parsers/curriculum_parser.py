@@ -2,9 +2,28 @@
 Curriculum parser for extracting weekly course content.
 """
 import re
-import json
-from bs4 import BeautifulSoup
-from typing import List, Dict
+import sys
+from pathlib import Path
+from typing import List, Dict, Union
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.html_utils import html_to_text
+from utils.json_utils import load_json_file, write_json
+from utils.parse_cache import cached_parse
+
+# Number of characters of each week's text written to curriculum.json
+CONTENT_PREVIEW_CHARS = 1000
+
+# Line-anchored patterns; [^\S\n] keeps every match inside a single line
+# Bullet line ("- topic", "• topic", "* topic"), capturing the stripped topic
+_BULLET_RE = re.compile(r'^[^\S\n]*[-•*][^\S\n]*(.*?)[^\S\n]*$', re.MULTILINE)
+# Non-bullet line mentioning hands-on work, capturing the stripped line
+_HANDSON_RE = re.compile(
+    r'^(?![^\S\n]*[-•*])[^\S\n]*(.*?(?:hands-on|case on).*?)[^\S\n]*$',
+    re.MULTILINE | re.IGNORECASE
+)
 
 
 class CurriculumParser:
@@ -13,12 +32,9 @@ class CurriculumParser:
     def __init__(self):
         self.weeks_pattern = re.compile(r'Week\s+(\d+):\s*([^\n]+)', re.IGNORECASE)
     
-    def parse_from_html(self, html: str) -> Dict:
-        """Parse curriculum from HTML content."""
-        soup = BeautifulSoup(html, 'lxml')
-        text = soup.get_text(separator='\n', strip=False)
-        
-        return self.parse_from_text(text)
+    def parse_from_html(self, html: Union[bytes, str]) -> Dict:
+        """Parse curriculum from HTML content, using the same text as the scraper's full_text."""
+        return self.parse_from_text(html_to_text(html))
     
     def parse_from_text(self, text: str) -> Dict:
         """Parse curriculum from plain text."""
@@ -47,45 +63,40 @@ class CurriculumParser:
     
     def _parse_week_content(self, week_number: int, title: str, content: str) -> Dict:
         """Parse individual week content."""
-        lines = content.split('\n')
+        # Extract bullet points as topics, avoiding empty or very short lines
+        topics = [m.group(1) for m in _BULLET_RE.finditer(content) if len(m.group(1)) > 3]
         
-        topics = []
+        # The last hands-on line in the week wins
         hands_on = ""
-        
-        # Extract bullet points as topics
-        for line in lines:
-            line = line.strip()
-            if line.startswith(('-', '•', '*')):
-                # Remove bullet and clean
-                topic = re.sub(r'^[-•*]\s*', '', line).strip()
-                if topic and len(topic) > 3:  # Avoid empty or very short lines
-                    topics.append(topic)
-            elif 'hands-on' in line.lower() or 'case on' in line.lower():
-                hands_on = line.strip()
+        for match in _HANDSON_RE.finditer(content):
+            hands_on = match.group(1)
         
         return {
             "week_number": week_number,
             "title": title,
             "topics": topics,
             "hands_on_learning": hands_on,
-            "content": content[:1000]  # First 1000 chars
+            # Full week text; trimmed to CONTENT_PREVIEW_CHARS by save_to_json
+            "content": content
         }
     
     def parse_from_file(self, file_path: str) -> Dict:
         """Parse curriculum from saved JSON or HTML file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            if file_path.endswith('.json'):
-                data = json.load(f)
-                text = data.get('full_text', '')
-                return self.parse_from_text(text)
-            else:  # HTML
-                html = f.read()
-                return self.parse_from_html(html)
+        if file_path.endswith('.json'):
+            data = load_json_file(file_path)
+            text = data.get('full_text', '')
+            return cached_parse("curriculum", text, self.parse_from_text, __file__)
+        with open(file_path, 'r', encoding='utf-8') as f:  # HTML
+            html = f.read()
+        return cached_parse("curriculum_html", html, self.parse_from_html, __file__)
     
     def save_to_json(self, curriculum_data: Dict, output_path: str) -> None:
-        """Save parsed curriculum to JSON file."""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(curriculum_data, f, indent=2, ensure_ascii=False)
+        """Save parsed curriculum to JSON file, trimming each week's content."""
+        weeks = [
+            dict(week, content=week['content'][:CONTENT_PREVIEW_CHARS])
+            for week in curriculum_data.get('weeks', [])
+        ]
+        write_json(dict(curriculum_data, weeks=weeks), output_path)
         print(f"[OK] Saved curriculum data to {output_path}")
 
 
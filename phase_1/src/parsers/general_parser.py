@@ -15,6 +15,100 @@ from utils.text_utils import (
     extract_cohort_number, contains_keywords
 )
 
+# Patterns are compiled once at import instead of on every re.search call
+
+# Program details are found in a single pass: each alternative is a named
+# group, and the first match of each group is kept. The lookahead tries the
+# alternatives at every position without consuming text, so matches may
+# overlap as separate searches' matches could ("1100 hours" holds both an
+# hour count and "100 hours"). "100+ hours" is tried before the generic
+# hours pattern so it wins at the same position.
+_DETAILS_RE = re.compile(
+    r'(?=(?P<hours_100>100\+?\s*(?:Hours?|hrs?))'
+    r'|(?P<hours>\d+\+?\s*(?:Hours?|hrs?))'
+    r'|(?P<months>(?P<months_n>\d+)\s*(?:months?|month))'
+    r'|(?P<weeks>(?P<weeks_n>\d+)\s*(?:weeks?|week))'
+    r'|(?P<live_class>live\s+(?:online\s+)?class))',
+    re.IGNORECASE
+)
+_DETAIL_GROUPS = frozenset(('hours_100', 'months', 'weeks', 'live_class'))
+# Time range (e.g. "10:30 AM - 12:30 PM IST"); [^\S\n] keeps a match on one line
+_TIME_RE = re.compile(
+    r'(\d{1,2}:\d{2}[^\S\n]*(?:AM|PM))[^\S\n]*-[^\S\n]*(\d{1,2}:\d{2}[^\S\n]*(?:AM|PM))[^\S\n]*(?:IST)?',
+    re.IGNORECASE
+)
+# Lines of context taken on each side of a schedule line
+_SCHEDULE_CONTEXT_LINES = 2
+# Day keywords looked for in a schedule line's context, and the day each names
+_DAY_RE = re.compile(r'saturday|sunday|wednesday|thursday|weekday')
+_DAY_NAMES = {
+    'saturday': 'saturday',
+    'sunday': 'sunday',
+    'wednesday': 'midweek',
+    'thursday': 'midweek',
+    'weekday': 'weekday',
+}
+# When several days are mentioned nearby, the earliest in this order wins
+_DAY_PRIORITY = ('saturday', 'sunday', 'midweek', 'weekday')
+# (day, slot) -> schedule key
+_SLOT_TABLE = {
+    ('saturday', 'morning'): 'saturday_morning',
+    ('saturday', 'afternoon'): 'saturday_afternoon',
+    ('sunday', 'mentor'): 'sunday_mentor_session',
+    ('sunday', 'case'): 'sunday_case_hours',
+    ('midweek', 'challenge'): 'wednesday_challenge',
+    ('weekday', 'session'): 'weekday_session',
+}
+
+
+def _schedule_slot(day: str, hour: int, is_am: bool, context: str):
+    """Classify a time range on the given day into a slot, or None."""
+    if day == 'saturday':
+        if is_am and 10 <= hour <= 12:
+            return 'morning'
+        if hour >= 2 or not is_am:
+            return 'afternoon'
+    elif day == 'sunday':
+        if 'mentor' in context:
+            return 'mentor'
+        if 'case' in context or 'hour' in context:
+            return 'case'
+        # Try to infer based on time
+        if hour == 10 and is_am:
+            return 'mentor'
+        if hour >= 2:
+            return 'case'
+    elif day == 'midweek':
+        if 'challenge' in context or 'product' in context:
+            return 'challenge'
+    else:
+        return 'session'
+    return None
+
+
+# Price patterns, each paired with fixed substrings one of which must be
+# present for it to match; a cheap `in` check skips the regex otherwise
+_PRICE_RES = tuple((needles, re.compile(p)) for needles, p in (
+    (('35,999', '35999'), r'[₹Rs]\s*35,?999'),
+    (('39,999', '39999'), r'[₹Rs]\s*39,?999'),
+    (('₹',), r'[₹]\s?[\d,]+'),
+))
+_START_DATE_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(?:starts?|starting|begins?)\s+(?:on\s+)?([A-Z][a-z]+\s+\d{1,2}(?:,\s*\d{4})?)',
+    r'([A-Z][a-z]+\s+\d{1,2}(?:,\s*\d{4})?)\s*(?:start|cohort)',
+))
+_MENTOR_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'personalised mentorship from ([^.]+)',
+    r'mentorship\s+(?:with\s+)?([^.\n]+?(?:PM|product manager|leader)[^.\n]*)',
+    r'guidance.*from\s+([^.\n]+)',
+))
+_MENTOR_RE = re.compile(r'mentor', re.IGNORECASE)
+_PLACEMENT_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'placement support\s+for\s+(\d+\s+\w+)',
+    r'(\d+\s+year)\s+placement',
+))
+_PLACEMENT_RE = re.compile(r'placement.*support|job placement', re.IGNORECASE)
+
 
 class GeneralParser(BaseParser):
     """Parse general program information including schedule, cost, timeline."""
@@ -33,27 +127,29 @@ class GeneralParser(BaseParser):
         """Extract program details like duration, hours, format."""
         details = {}
         
-        # Extract hours (e.g., "100+ Hours")
-        hours_match = re.search(r'(100\+?\s*(?:Hours?|hrs?))', text, re.IGNORECASE)
-        if hours_match:
+        # Collect the first match of every group in one scan, stopping as
+        # soon as nothing further could change the result
+        first = {}
+        for match in _DETAILS_RE.finditer(text):
+            first.setdefault(match.lastgroup, match)
+            if _DETAIL_GROUPS.issubset(first):
+                break
+        
+        # Extract hours (e.g., "100+ Hours"), falling back to any hour count
+        if 'hours_100' in first:
             details["total_hours"] = "100+ hours"
-        else:
-            # Fallback pattern
-            hours_match = re.search(r'(\d+\+?)\s*(?:Hours?|hrs?)', text, re.IGNORECASE)
-            if hours_match:
-                details["total_hours"] = hours_match.group(0)
+        elif 'hours' in first:
+            details["total_hours"] = first['hours'].group('hours')
         
         # Extract fellowship duration (e.g., "4 months", "16 weeks")
-        months_match = re.search(r'(\d+)\s*(?:months?|month)', text, re.IGNORECASE)
-        if months_match:
-            details["duration_months"] = f"{months_match.group(1)} months"
+        if 'months' in first:
+            details["duration_months"] = f"{first['months'].group('months_n')} months"
         
-        weeks_match = re.search(r'(\d+)\s*(?:weeks?|week)', text, re.IGNORECASE)
-        if weeks_match:
-            details["duration_weeks"] = f"{weeks_match.group(1)} weeks"
+        if 'weeks' in first:
+            details["duration_weeks"] = f"{first['weeks'].group('weeks_n')} weeks"
         
         # Extract format
-        if re.search(r'live\s+(?:online\s+)?class', text, re.IGNORECASE):
+        if 'live_class' in first:
             details["format"] = "Live online classes"
         
         return details
@@ -62,53 +158,44 @@ class GeneralParser(BaseParser):
         """Parse class schedule with times and days."""
         schedule = {}
         
-        # Look for time patterns (e.g., "10:30 AM - 12:30 PM IST")
-        time_pattern = r'(\d{1,2}:\d{2}\s*(?:AM|PM))\s*-\s*(\d{1,2}:\d{2}\s*(?:AM|PM))\s*(?:IST)?'
-        
-        lines = text.split('\n')
-        
-        # Specific patterns for known schedule
-        for i, line in enumerate(lines):
-            time_match = re.search(time_pattern, line, re.IGNORECASE)
-            if not time_match:
+        # One scan over the whole text; only the first time range on a line counts
+        last_line_start = -1
+        for time_match in _TIME_RE.finditer(text):
+            line_start = text.rfind('\n', 0, time_match.start()) + 1
+            if line_start == last_line_start:
                 continue
+            last_line_start = line_start
             
             time_slot = f"{time_match.group(1)} - {time_match.group(2)} IST"
             
             # Check context around this line for day information
-            context = ' '.join(lines[max(0, i-2):min(len(lines), i+3)]).lower()
+            context_start = line_start
+            for _ in range(_SCHEDULE_CONTEXT_LINES):
+                if context_start == 0:
+                    break
+                context_start = text.rfind('\n', 0, context_start - 1) + 1
+            context_end = time_match.end()
+            for _ in range(_SCHEDULE_CONTEXT_LINES + 1):
+                newline = text.find('\n', context_end)
+                if newline == -1:
+                    context_end = len(text)
+                    break
+                context_end = newline + 1
+            context = text[context_start:context_end].lower()
             
-            # Saturday sessions
-            if 'saturday' in context:
-                hour_start = int(time_match.group(1).split(':')[0])
-                is_am = 'AM' in time_match.group(1).upper()
-                
-                if (hour_start == 10 and is_am) or (hour_start >=10 and hour_start <= 12 and is_am):
-                    schedule["saturday_morning"] = time_slot
-                elif hour_start >= 2 or 'PM' in time_match.group(1).upper():
-                    schedule["saturday_afternoon"] = time_slot
+            # Pick the highest-priority day mentioned nearby
+            days = {_DAY_NAMES[d] for d in _DAY_RE.findall(context)}
+            day = next((d for d in _DAY_PRIORITY if d in days), None)
+            if day is None:
+                continue
             
-            # Sunday sessions
-            elif 'sunday' in context:
-                if 'mentor' in context:
-                    schedule["sunday_mentor_session"] = time_slot
-                elif 'case' in context or 'hour' in context:
-                    schedule["sunday_case_hours"] = time_slot
-                else:
-                    # Try to infer based on time
-                    hour_start = int(time_match.group(1).split(':')[0])
-                    is_am = 'AM' in time_match.group(1).upper()
-                    if hour_start == 10 and is_am:
-                        schedule["sunday_mentor_session"] = time_slot
-                    elif hour_start >= 2:
-                        schedule["sunday_case_hours"] = time_slot
+            start_time = time_match.group(1)
+            hour = int(start_time[:start_time.index(':')])
+            is_am = start_time[-2:].upper() == 'AM'
             
-            # Wednesday/Thursday sessions
-            elif 'wednesday' in context or 'thursday' in context:
-                if 'challenge' in context or 'product' in context:
-                    schedule["wednesday_challenge"] = time_slot
-            elif 'weekday' in context:
-                schedule["weekday_session"] = time_slot
+            key = _SLOT_TABLE.get((day, _schedule_slot(day, hour, is_am, context)))
+            if key:
+                schedule[key] = time_slot
         
         return schedule
     
@@ -118,14 +205,10 @@ class GeneralParser(BaseParser):
         
         # Extract price - look for specific amounts
         # Common patterns: ₹35,999 or 35999 or Rs 35999
-        price_patterns = [
-            r'[₹Rs]\s*35,?999',
-            r'[₹Rs]\s*39,?999',
-            r'[₹]\s?[\d,]+',
-        ]
-        
-        for pattern in price_patterns:
-            match = re.search(pattern, text)
+        for needles, pattern in _PRICE_RES:
+            if not any(needle in text for needle in needles):
+                continue
+            match = pattern.search(text)
             if match:
                 cost_info["course_fee"] = match.group(0).strip()
                 break
@@ -142,13 +225,8 @@ class GeneralParser(BaseParser):
             cohort_info["cohort_number"] = cohort_num
         
         # Extract start date - looking for specific date patterns
-        date_patterns = [
-            r'(?:starts?|starting|begins?)\s+(?:on\s+)?([A-Z][a-z]+\s+\d{1,2}(?:,\s*\d{4})?)',
-            r'([A-Z][a-z]+\s+\d{1,2}(?:,\s*\d{4})?)\s*(?:start|cohort)',
-        ]
-        
-        for pattern in date_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _START_DATE_RES:
+            match = pattern.search(text)
             if match:
                 cohort_info["start_date"] = match.group(1).strip()
                 break
@@ -160,34 +238,23 @@ class GeneralParser(BaseParser):
         support_info = {}
         
         # Mentorship - look for specific phrases
-        mentor_patterns = [
-            r'personalised mentorship from ([^.]+)',
-            r'mentorship\s+(?:with\s+)?([^.\n]+?(?:PM|product manager|leader)[^.\n]*)',
-            r'guidance.*from\s+([^.\n]+)',
-        ]
-        
-        for pattern in mentor_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _MENTOR_RES:
+            match = pattern.search(text)
             if match:
                 support_info["mentorship"] = match.group(1).strip()
                 break
         
-        if not support_info.get("mentorship") and re.search(r'mentor', text, re.IGNORECASE):
+        if not support_info.get("mentorship") and _MENTOR_RE.search(text):
             support_info["mentorship"] = "Experienced PMs from top companies"
         
         # Placement support
-        placement_patterns = [
-            r'placement support\s+for\s+(\d+\s+\w+)',
-            r'(\d+\s+year)\s+placement',
-        ]
-        
-        for pattern in placement_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _PLACEMENT_RES:
+            match = pattern.search(text)
             if match:
                 support_info["placement_support"] = match.group(1).strip() + " placement support"
                 break
         
-        if not support_info.get("placement_support") and re.search(r'placement.*support|job placement', text, re.IGNORECASE):
+        if not support_info.get("placement_support") and _PLACEMENT_RE.search(text):
             support_info["placement_support"] = "1 year placement support"
         
         return support_info
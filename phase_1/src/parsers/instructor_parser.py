@@ -1,24 +1,56 @@
 """
 Improved instructor parser that works directly with HTML.
 """
+import io
 import re
 import sys
 from pathlib import Path
-from typing import List, Dict
-from bs4 import BeautifulSoup
-import json
+from typing import List, Dict, Union
+from lxml import etree
 
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from parsers.base_parser import BaseParser
+from utils.json_utils import load_json_file
+from utils.parse_cache import cached_parse
+
+# XPath expressions are compiled once at import and reused for every parse
+_STRONG_XP = etree.XPath('(.//strong)[1]')
+
+# Teaching-related keywords that mark a list item as an instructor entry
+_INSTRUCTOR_KEYWORDS_RE = re.compile(r'teach(?:es|ing)|curriculum|module', re.IGNORECASE)
+
+
+def _stripped_text(element) -> str:
+    """Element text with each text node stripped and joined without separators,
+    as BeautifulSoup's get_text(strip=True) returns it."""
+    return ''.join(s.strip() for s in element.itertext())
+
+
+_ROLE_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    # Pattern 1: "is/was a/the [role] at [company]"
+    r'(?:is|was)\s+(?:a|the)\s+([^.]+?)\s+at\s+(\w+)',
+    r'leads?\s+(?:the\s+)?([^.]+?)\s+at\s+(\w+)',
+    r'([^.]*?(?:lead|manager|scientist|designer|engineer)[^.]*?)\s+at\s+(\w+)',
+))
+# Pattern: "teaches [something]" or "teaching [something]"
+_TEACHING_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'teaches?\s+(?:the\s+)?([^.]+?)(?:\.|$)',
+    r'teaching\s+(?:the\s+)?([^.]+?)(?:\.|$)',
+))
+# Look for "previously" or "was previously"
+_BACKGROUND_RES = tuple(re.compile(p, re.IGNORECASE) for p in (
+    r'(?:was\s+)?previously\s+([^.]+)',
+    r'has\s+previously\s+worked\s+at\s+([^.]+)',
+))
 
 
 class InstructorParser(BaseParser):
     """Parse instructor/mentor information from course HTML."""
     
-    def parse(self, content: str) -> List[Dict]:
-        """Parse all instructors from HTML content."""
+    def parse(self, content: Union[bytes, str]) -> List[Dict]:
+        """Parse all instructors from HTML content (UTF-8 bytes or str)."""
         # First try HTML parsing
         instructors = self._parse_from_html(content)
         
@@ -29,26 +61,37 @@ class InstructorParser(BaseParser):
         # Fall back to text parsing if HTML parsing didn't work well
         return self._parse_from_text(content)
     
-    def _parse_from_html(self, html: str) -> List[Dict]:
+    def _parse_from_html(self, html: Union[bytes, str]) -> List[Dict]:
         """Extract instructors from HTML structure."""
         instructors = []
         
         try:
-            soup = BeautifulSoup(html, 'lxml')
+            # Stream the document and only look at <li> elements as they close,
+            # rather than building the whole tree and walking it afterwards
+            source = html if isinstance(html, bytes) else html.encode('utf-8')
+            context = etree.iterparse(
+                io.BytesIO(source),
+                events=('end',), tag='li', html=True, encoding='utf-8'
+            )
             
             # Look for list items with instructor information
             # Pattern: <li><strong>Name</strong> description...</li>
-            list_items = soup.find_all('li')
-            
-            for li in list_items:
-                text = li.get_text(strip=True)
+            for _, li in context:
+                text = _stripped_text(li)
                 
                 # Check if this looks like an instructor entry
                 # (contains teaching-related keywords)
-                if any(keyword in text.lower()  for keyword in ['teaches', 'teaching', 'curriculum', 'module']):
+                if _INSTRUCTOR_KEYWORDS_RE.search(text):
                     instructor = self._extract_instructor_from_li(li, text)
                     if instructor:
                         instructors.append(instructor)
+                
+                # Free processed items, unless an enclosing <li> still needs
+                # this one's text when it closes
+                if next(li.iterancestors('li'), None) is None:
+                    li.clear(keep_tail=True)
+                    while li.getprevious() is not None:
+                        del li.getparent()[0]
             
         except Exception as e:
             print(f"[INFO] HTML parsing encountered an issue: {e}")
@@ -58,16 +101,20 @@ class InstructorParser(BaseParser):
     def _extract_instructor_from_li(self, li_element, text: str) -> Dict:
         """Extract instructor details from a list item element."""
         # Try to find name in <strong> tag
-        strong_tag = li_element.find('strong')
-        name = strong_tag.get_text(strip=True) if strong_tag else None
+        strong = _STRONG_XP(li_element)
+        name = _stripped_text(strong[0]) if strong else ''
         
         # If we found a name, extract other details
         if name and len(name) > 2 and len(name) < 50:
             # Extract full text
             full_text = text
             
-            # Remove the name from text to get description
-            description = full_text.replace(name, '', 1).strip()
+            # Remove the name from text to get description; the <strong>
+            # usually leads the item, so slice it off instead of searching
+            if full_text.startswith(name):
+                description = full_text[len(name):].strip()
+            else:
+                description = full_text.replace(name, '', 1).strip()
             
             # Extract role/company
             role = self._extract_role(description)
@@ -89,15 +136,8 @@ class InstructorParser(BaseParser):
     
     def _extract_role(self, text: str) -> str:
         """Extract job title/role from description."""
-        # Pattern 1: "is/was a/the [role] at [company]"
-        role_patterns = [
-            r'(?:is|was)\s+(?:a|the)\s+([^.]+?)\s+at\s+(\w+)',
-            r'leads?\s+(?:the\s+)?([^.]+?)\s+at\s+(\w+)',
-            r'([^.]*?(?:lead|manager|scientist|designer|engineer)[^.]*?)\s+at\s+(\w+)',
-        ]
-        
-        for pattern in role_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _ROLE_RES:
+            match = pattern.search(text)
             if match:
                 role_part = match.group(1).strip()
                 company = match.group(2).strip()
@@ -107,14 +147,8 @@ class InstructorParser(BaseParser):
     
     def _extract_teaching_info(self, text: str) -> str:
         """Extract what the instructor teaches."""
-        # Pattern: "teaches [something]" or "teaching [something]"
-        teaching_patterns = [
-            r'teaches?\s+(?:the\s+)?([^.]+?)(?:\.|$)',
-            r'teaching\s+(?:the\s+)?([^.]+?)(?:\.|$)',
-        ]
-        
-        for pattern in teaching_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _TEACHING_RES:
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         
@@ -122,14 +156,8 @@ class InstructorParser(BaseParser):
     
     def _extract_background(self, text: str) -> str:
         """Extract background information."""
-        # Look for "previously" or "was previously"
-        bg_patterns = [
-            r'(?:was\s+)?previously\s+([^.]+)',
-            r'has\s+previously\s+worked\s+at\s+([^.]+)',
-        ]
-        
-        for pattern in bg_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern in _BACKGROUND_RES:
+            match = pattern.search(text)
             if match:
                 return match.group(1).strip()
         
@@ -141,32 +169,28 @@ class InstructorParser(BaseParser):
         return []
     
     def _deduplicate_by_name(self, instructors: List[Dict]) -> List[Dict]:
-        """Remove duplicate instructors by name."""
-        seen_names = set()
-        unique = []
-        
+        """Remove duplicate instructors by name, keeping the first occurrence."""
+        # Dicts preserve insertion order, so one hash probe per entry both
+        # deduplicates and keeps the original ordering
+        unique = {}
         for inst in instructors:
-            name_normalized = inst['name'].lower().strip()
-            if name_normalized not in seen_names:
-                seen_names.add(name_normalized)
-                unique.append(inst)
+            unique.setdefault(inst['name'].strip().casefold(), inst)
         
-        return unique
+        return list(unique.values())
     
     def parse_from_file(self, file_path: str) -> List[Dict]:
         """Parse instructors from file (HTML or JSON)."""
         # Load content
         content = ""
         if file_path.endswith('.json'):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                # Try to get HTML from JSON
-                content = data.get('html', data.get('full_text', ''))
+            data = load_json_file(file_path)
+            # Try to get HTML from JSON
+            content = data.get('html', data.get('full_text', ''))
         else:
             with open(file_path, 'r', encoding='utf-8') as f:
                 content = f.read()
         
-        return self.parse(content)
+        return cached_parse("instructors", content, self.parse, __file__)
 
 
 if __name__ == "__main__":
@@ -2,9 +2,16 @@
 Tools parser for extracting tools and technologies.
 """
 import re
-import json
+import sys
+from pathlib import Path
 from typing import List, Dict
 
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.json_utils import load_json_file, write_json
+from utils.parse_cache import cached_parse
+
 
 class ToolsParser:
     """Parse tools and technologies from course content."""
@@ -22,6 +29,22 @@ class ToolsParser:
             "Python", "ChatGPT", "Claude", "Groq", "API", "REST", "GraphQL",
             "MongoDB", "PostgreSQL", "ChromaDB", "FAISS", "LangChain"
         ]
+        
+        # One case-insensitive alternation per keyword list, so each line is
+        # scanned once in C instead of once per keyword. The zero-width
+        # lookahead reports overlapping hits too ("SQL" inside "PostgreSQL"),
+        # matching the previous substring checks.
+        self._category_re = self._build_alternation(self.categories)
+        self._tool_re = self._build_alternation(self.known_tools)
+        self._category_rank = {cat.lower(): i for i, cat in enumerate(self.categories)}
+        self._category_names = {cat.lower(): cat for cat in self.categories}
+        self._tool_names = {tool.lower(): tool for tool in self.known_tools}
+    
+    @staticmethod
+    def _build_alternation(keywords: List[str]) -> re.Pattern:
+        """Compile keywords into one overlapping, case-insensitive matcher."""
+        alternation = '|'.join(re.escape(keyword) for keyword in keywords)
+        return re.compile(f'(?=({alternation}))', re.IGNORECASE)
     
     def parse_from_text(self, text: str) -> List[Dict]:
         """Parse tools from text content."""
@@ -31,21 +54,19 @@ class ToolsParser:
         current_category = "General"
         
         for line in lines:
-            line = line.strip()
-            
-            # Check if line is a category
-            if any(cat.lower() in line.lower() for cat in self.categories):
-                for cat in self.categories:
-                    if cat.lower() in line.lower():
-                        current_category = cat
-                        break
+            # Check if line is a category (earliest listed category wins)
+            categories = self._category_re.findall(line)
+            if len(categories) == 1:
+                current_category = self._category_names[categories[0].lower()]
+            elif categories:
+                first = min((cat.lower() for cat in categories), key=self._category_rank.__getitem__)
+                current_category = self._category_names[first]
             
             # Extract tools from line
-            for tool in self.known_tools:
-                if tool.lower() in line.lower():
-                    if current_category not in tools_by_category:
-                        tools_by_category[current_category] = set()
-                    tools_by_category[current_category].add(tool)
+            tools = self._tool_re.findall(line)
+            if tools:
+                found = tools_by_category.setdefault(current_category, set())
+                found.update(self._tool_names[tool.lower()] for tool in tools)
         
         # Convert to list format
         tools_list = []
@@ -59,16 +80,14 @@ class ToolsParser:
     
     def parse_from_file(self, file_path: str) -> List[Dict]:
         """Parse tools from saved JSON file."""
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            text = data.get('full_text', '')
+        data = load_json_file(file_path)
+        text = data.get('full_text', '')
         
-        return self.parse_from_text(text)
+        return cached_parse("tools", text, self.parse_from_text, __file__)
     
     def save_to_json(self, tools: List[Dict], output_path: str) -> None:
         """Save parsed tools to JSON file."""
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(tools, f, indent=2, ensure_ascii=False)
+        write_json(tools, output_path)
         
         total_tools = sum(len(cat['tools']) for cat in tools)
         print(f"[OK] Saved {total_tools} tools across {len(tools)} categories to {output_path}")
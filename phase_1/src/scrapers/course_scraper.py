@@ -1,20 +1,41 @@
 """
 Course scraper for Nextleap Product Management Fellowship page.
 """
+import asyncio
+import httpx
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import json
 import time
 from datetime import datetime
 from pathlib import Path
 from bs4 import BeautifulSoup
-from typing import Dict, Optional
-import yaml
+from typing import Dict, List, Optional, Union
 import os
+import sys
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.config_cache import load_yaml_config
+from utils.html_utils import LXMLSoupBuilder, html_to_text
+from utils.json_utils import write_json
+
+# Class-name keywords that mark a <section>/<div> as a course section
+SECTION_KEYWORDS = ['curriculum', 'instructor', 'tool', 'schedule', 'testimonial']
+# One CSS selector for all of them, matched case-insensitively by the selector engine
+_SECTION_SELECTOR = ', '.join(
+    f'{tag}[class*="{keyword}" i]' for tag in ('section', 'div') for keyword in SECTION_KEYWORDS
+)
 
 
 class CoursePageScraper:
     """Scraper for Nextleap course page."""
     
+    # Upper bound on in-flight requests in fetch_pages
+    max_concurrency = 64
+    
     def __init__(self, config_path: str = None):
         """
         Initialize scraper with optional configuration.
@@ -29,8 +50,7 @@ class CoursePageScraper:
         
         # Load config if provided and exists
         if config_path and os.path.exists(config_path):
-            with open(config_path, 'r') as f:
-                config = yaml.safe_load(f)
+            config = load_yaml_config(config_path)
             
             scraping_config = config.get('scraping', {})
             self.course_url = scraping_config.get('course_url', self.course_url)
@@ -43,53 +63,120 @@ class CoursePageScraper:
             'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
             'Accept-Language': 'en-US,en;q=0.5',
         }
+        
+        # Keep-alive session so repeated fetches reuse the same connection
+        self.session = requests.Session()
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=10, pool_maxsize=10, max_retries=retry)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        
+        # lxml tree builder whose parsers are reused across extract_initial_data calls
+        self._soup_builder = LXMLSoupBuilder()
+    
+    def close(self) -> None:
+        """Close the HTTP session and its pooled connections."""
+        self.session.close()
+    
+    def __enter__(self):
+        return self
     
-    def fetch_page(self) -> Optional[str]:
-        """Fetch the course page HTML."""
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def fetch_page(self) -> Optional[bytes]:
+        """
+        Fetch the course page HTML.
+        
+        Returns the raw response bytes; they are written to disk and parsed
+        as-is, without an intermediate decode to str.
+        """
         print(f"Fetching course page from {self.course_url}...")
         
         try:
-            response = requests.get(
+            # Headers are passed per request so later changes to self.headers apply
+            response = self.session.get(
                 self.course_url,
                 headers=self.headers,
                 timeout=self.timeout
             )
             response.raise_for_status()
             print(f"[OK] Successfully fetched page (Status: {response.status_code})")
-            return response.text
+            return response.content
         
         except requests.exceptions.RequestException as e:
             print(f"[X] Error fetching page: {e}")
             return None
     
-    def save_raw_html(self, html: str, output_dir: str = "data/raw") -> str:
-        """Save raw HTML to file."""
+    def _async_client(self) -> httpx.AsyncClient:
+        """Create an HTTP/2 client shared by every request of an async scrape."""
+        return httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            http2=True,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    
+    async def fetch_pages(self, urls: List[str], client: httpx.AsyncClient = None) -> Dict[str, Optional[bytes]]:
+        """
+        Fetch several pages concurrently.
+        
+        Args:
+            urls: Page URLs to fetch
+            client: Open client to reuse (a temporary one is created if omitted)
+        
+        Returns:
+            Dict mapping each URL to its HTML bytes, or None if the fetch failed
+        """
+        if client is None:
+            async with self._async_client() as client:
+                return await self.fetch_pages(urls, client)
+        
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        
+        async def fetch(url: str) -> Optional[bytes]:
+            async with semaphore:
+                try:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    print(f"[OK] Fetched {url} (Status: {response.status_code})")
+                    return response.content
+                except httpx.HTTPError as e:
+                    print(f"[X] Error fetching {url}: {e}")
+                    return None
+        
+        pages = await asyncio.gather(*(fetch(url) for url in urls))
+        return dict(zip(urls, pages))
+    
+    def save_raw_html(self, html: Union[bytes, str], output_dir: str = "data/raw") -> str:
+        """Save raw HTML (bytes as fetched, or str) to file."""
         Path(output_dir).mkdir(parents=True, exist_ok=True)
         
         output_path = Path(output_dir) / "course_page.html"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(html)
+        if isinstance(html, str):
+            html = html.encode('utf-8')
+        output_path.write_bytes(html)
         
         print(f"[OK] Saved raw HTML to {output_path}")
         return str(output_path)
     
-    def extract_initial_data(self, html: str) -> Dict:
-        """Extract initial structured data from HTML."""
-        soup = BeautifulSoup(html, 'lxml')
+    def extract_initial_data(self, html: Union[bytes, str]) -> Dict:
+        """Extract initial structured data from HTML (bytes are decoded by the parser)."""
+        soup = BeautifulSoup(html, builder=self._soup_builder)
+        title_tag = soup.find('title')
         
         data = {
             "metadata": {
                 "scraped_at": datetime.now().isoformat(),
                 "url": self.course_url,
-                "title": soup.find('title').text if soup.find('title') else "Unknown"
+                "title": title_tag.text if title_tag else "Unknown"
             },
             "raw_sections": {}
         }
         
         # Extract main sections
-        sections = soup.find_all(['section', 'div'], class_=lambda x: x and any(
-            keyword in str(x).lower() for keyword in ['curriculum', 'instructor', 'tool', 'schedule', 'testimonial']
-        ))
+        sections = soup.select(_SECTION_SELECTOR)
         
         for i, section in enumerate(sections):
             section_id = section.get('id', f'section_{i}')
@@ -98,18 +185,16 @@ class CoursePageScraper:
                 "text": section.get_text(strip=True)[:500]  # First 500 chars as preview
             }
         
-        # Extract all text content for fallback
-        data["full_text"] = soup.get_text(separator='\n', strip=True)
+        # Extract all text content for fallback; lxml walks the text nodes in C,
+        # giving the same result as soup.get_text(separator='\n', strip=True)
+        data["full_text"] = html_to_text(html)
         
         return data
     
     def save_initial_json(self, data: Dict, output_dir: str = "data/raw") -> str:
         """Save initial extracted data as JSON."""
-        Path(output_dir).mkdir(parents=True, exist_ok=True)
-        
         output_path = Path(output_dir) / "scraped_content.json"
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
+        write_json(data, output_path)
         
         print(f"[OK] Saved initial data to {output_path}")
         return str(output_path)
@@ -128,6 +213,33 @@ class CoursePageScraper:
         if not html:
             return {"status": "failed", "error": "Could not fetch page"}
         
+        return self._save_scrape(html)
+    
+    async def scrape_async(self, extra_urls: List[str] = ()) -> Dict:
+        """
+        Async variant of scrape() that also fetches extra pages concurrently.
+        
+        The course page and all extra_urls share one HTTP/2 client; the extra
+        pages' HTML is returned under "pages".
+        """
+        print("\n" + "="*60)
+        print("Starting Nextleap Course Page Scraping (async)")
+        print("="*60 + "\n")
+        
+        urls = [self.course_url, *extra_urls]
+        async with self._async_client() as client:
+            pages = await self.fetch_pages(urls, client)
+        
+        html = pages.pop(self.course_url)
+        if not html:
+            return {"status": "failed", "error": "Could not fetch page"}
+        
+        result = self._save_scrape(html)
+        result["pages"] = pages
+        return result
+    
+    def _save_scrape(self, html: bytes) -> Dict:
+        """Save raw HTML and extracted data for a fetched course page."""
         # Save raw HTML
         html_path = self.save_raw_html(html)
         
@@ -148,8 +260,7 @@ class CoursePageScraper:
             "metadata": data["metadata"]
         }
 
-
 if __name__ == "__main__":
-    scraper = CoursePageScraper()
-    result = scraper.scrape()
+    with CoursePageScraper() as scraper:
+        result = scraper.scrape()
     print(f"\nResult: {json.dumps(result, indent=2)}")
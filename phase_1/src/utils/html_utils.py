@@ -0,0 +1,62 @@
+"""
+HTML helpers shared by the scraper and parsers.
+"""
+from typing import Dict, Optional, Union
+from bs4.builder._lxml import LXMLTreeBuilder
+from lxml import etree
+from lxml import html as lxml_html
+
+# Bytes input is UTF-8, as fetched from the course page
+_UTF8_PARSER = lxml_html.HTMLParser(encoding='utf-8')
+
+# Every text node BeautifulSoup's get_text() would include: those outside
+# <script>, <style>, <template> and ruby annotations, compiled once at import
+_TEXT_XP = etree.XPath(
+    '//text()[not(ancestor::script or ancestor::style or ancestor::template'
+    ' or ancestor::rt or ancestor::rp)]',
+    smart_strings=False
+)
+
+
+def html_to_text(html: Union[bytes, str]) -> str:
+    """
+    Convert HTML (UTF-8 bytes or str) to newline-separated plain text.
+    
+    Each text node is stripped and empty ones are dropped, matching the
+    scraper's get_text(separator='\\n', strip=True) output.
+    """
+    if isinstance(html, bytes):
+        tree = lxml_html.fromstring(html, parser=_UTF8_PARSER)
+    else:
+        tree = lxml_html.fromstring(html)
+    return '\n'.join(s for s in (node.strip() for node in _TEXT_XP(tree)) if s)
+
+
+class LXMLSoupBuilder(LXMLTreeBuilder):
+    """
+    BeautifulSoup 'lxml' tree builder that keeps its lxml parsers.
+    
+    The stock builder constructs a new etree.HTMLParser for every document;
+    this one creates one per encoding and reuses it, with comments and
+    processing instructions dropped by the parser since nothing reads them.
+    Pass an instance as BeautifulSoup(html, builder=...). A builder holds
+    parser state, so use it from one thread at a time.
+    """
+    
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._parsers: Dict[Optional[str], etree.HTMLParser] = {}
+    
+    def parser_for(self, encoding: Optional[str]) -> etree.HTMLParser:
+        parser = self._parsers.get(encoding)
+        if parser is None:
+            parser = etree.HTMLParser(
+                target=self,
+                encoding=encoding,
+                recover=True,
+                huge_tree=False,
+                remove_comments=True,
+                remove_pis=True,
+            )
+            self._parsers[encoding] = parser
+        return parser
@@ -0,0 +1,37 @@
+"""
+JSON helpers backed by orjson, with a stdlib fallback.
+"""
+from pathlib import Path
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements
+    orjson = None
+    import json
+
+
+def loads(raw: bytes) -> Any:
+    """Decode JSON from bytes (or str)."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def dumps(data: Any) -> bytes:
+    """Encode data as UTF-8 JSON bytes with 2-space indentation."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(data, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def load_json_file(file_path) -> Any:
+    """Read and decode a JSON file in one binary read."""
+    return loads(Path(file_path).read_bytes())
+
+
+def write_json(data: Any, file_path) -> None:
+    """Encode data and write it in one call, creating parent directories."""
+    path = Path(file_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(dumps(data))
@@ -0,0 +1,73 @@
+"""
+Content-addressed cache for parser results.
+
+Results are stored as .cache/<name>_<sha256>.json, keyed by the parser
+input and the modification times of the parser module and the shared
+modules it builds on, so a re-run with unchanged input and code skips
+parsing entirely.
+"""
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Tuple, Union
+
+from utils.json_utils import dumps, loads
+
+CACHE_DIR = Path(".cache")
+
+# Modules whose code shapes every parser's output: editing one invalidates
+# all cached results, as editing a parser module invalidates its own
+_SHARED_SOURCES = (
+    Path(__file__).parent.parent / 'parsers' / 'base_parser.py',
+    Path(__file__).parent / 'html_utils.py',
+    Path(__file__).parent / 'text_utils.py',
+    Path(__file__).parent / 'json_utils.py',
+)
+
+# In-process layer: encoded results of this run, keyed by (name, digest)
+_memo: Dict[Tuple[str, str], bytes] = {}
+
+
+@lru_cache(maxsize=None)
+def _source_version(source_file: str) -> bytes:
+    """Version tag for a parser module; changes whenever it or a shared module is edited."""
+    return b','.join(
+        str(os.stat(path).st_mtime_ns).encode() for path in (source_file, *_SHARED_SOURCES)
+    )
+
+
+def cached_parse(name: str, content: Union[bytes, str], parse_fn: Callable[[Any], Any],
+                 source_file: str) -> Any:
+    """
+    Return parse_fn(content), reusing a cached result when available.
+    
+    Args:
+        name: Cache file prefix (e.g. "instructors")
+        content: Parser input (text, or raw HTML bytes); its hash is the cache key
+        parse_fn: Function that parses content
+        source_file: Parser module path, used to invalidate on code changes
+    """
+    data = content if isinstance(content, bytes) else content.encode('utf-8')
+    digest = hashlib.sha256(_source_version(source_file) + b'\0' + data).hexdigest()
+    key = (name, digest)
+    
+    raw = _memo.get(key)
+    if raw is None:
+        cache_path = CACHE_DIR / f"{name}_{digest}.json"
+        if cache_path.exists():
+            raw = cache_path.read_bytes()
+            print(f"[INFO] Using cached {name} from {cache_path}")
+        else:
+            result = parse_fn(content)
+            raw = dumps(result)
+            try:
+                CACHE_DIR.mkdir(parents=True, exist_ok=True)
+                cache_path.write_bytes(raw)
+            except OSError as e:
+                print(f"[INFO] Could not write parse cache: {e}")
+            _memo[key] = raw
+            return result
+        _memo[key] = raw
+    
+    return loads(raw)
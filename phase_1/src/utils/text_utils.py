@@ -2,7 +2,49 @@
 Utility functions for text processing and pattern matching.
 """
 import re
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pragma: no cover - pyahocorasick is listed in requirements
+    ahocorasick = None
+
+# Patterns are compiled once at import instead of on every re.search call
+# Capitalized words (2-4 words max for name)
+_NAME_RE = re.compile(r'^([A-Z][a-z]+(?: [A-Z][a-z]+){0,3})\b')
+_MONEY_RE = re.compile(r'[₹$]\s?[\d,]+')
+
+# Duration and date each fuse a preferred and a fallback pattern into one
+# scan. The alternation sits in a lookahead so that every start position is
+# tried and a fallback match never hides an overlapping preferred one
+# (e.g. "7 March 12" must still yield "March 12").
+_DURATION_RE = re.compile(
+    r'(?=(?P<preferred>\d+\+?\s*(?:hours?|hrs?))'
+    r'|(?P<fallback>\d+\s*(?:months?|weeks?|days?)))',
+    re.IGNORECASE
+)
+_MONTH = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*'
+_DATE_RE = re.compile(
+    rf'(?=(?P<preferred>{_MONTH}\s+\d{{1,2}}(?:,\s*\d{{4}})?)'
+    rf'|(?P<fallback>\d{{1,2}}\s+{_MONTH}(?:,\s*\d{{4}})?))',
+    re.IGNORECASE
+)
+_COHORT_RE = re.compile(r'Cohort\s+(\d+)', re.IGNORECASE)
+
+
+def _search_preferred(pattern: re.Pattern, text: str) -> Optional[str]:
+    """
+    Return the leftmost "preferred" match of a fused pattern, or else the
+    leftmost "fallback" match, as if each were searched for separately.
+    """
+    fallback = None
+    for match in pattern.finditer(text):
+        if match.lastgroup == 'preferred':
+            return match.group('preferred')
+        if fallback is None:
+            fallback = match.group('fallback')
+    return fallback
 
 
 def extract_name_from_text(text: str) -> Optional[str]:
@@ -13,8 +55,7 @@ def extract_name_from_text(text: str) -> Optional[str]:
     lines = text.split('\n')
     for line in lines[:3]:  # Check first 3 lines
         # Look for capitalized words (2-4 words max for name)
-        name_pattern = r'^([A-Z][a-z]+(?: [A-Z][a-z]+){0,3})\b'
-        match = re.search(name_pattern, line.strip())
+        match = _NAME_RE.search(line.strip())
         if match:
             potential_name = match.group(1)
             # Filter out common false positives
@@ -25,42 +66,23 @@ def extract_name_from_text(text: str) -> Optional[str]:
 
 def extract_money_amount(text: str) -> Optional[str]:
     """Extract money amounts like ₹35,999 or $500."""
-    pattern = r'[₹$]\s?[\d,]+'
-    match = re.search(pattern, text)
+    match = _MONEY_RE.search(text)
     return match.group(0) if match else None
 
 
 def extract_duration(text: str) -> Optional[str]:
     """Extract duration like '4 months', '100+ hours', '16 weeks'."""
-    patterns = [
-        r'\d+\+?\s*(?:hours?|hrs?)',
-        r'\d+\s*(?:months?|weeks?|days?)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(0)
-    return None
+    return _search_preferred(_DURATION_RE, text)
 
 
 def extract_date(text: str) -> Optional[str]:
     """Extract dates like 'Mar 7', 'March 7, 2024'."""
-    patterns = [
-        r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*\s+\d{1,2}(?:,\s*\d{4})?',
-        r'\d{1,2}\s+(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]*(?:,\s*\d{4})?',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            return match.group(0)
-    return None
+    return _search_preferred(_DATE_RE, text)
 
 
 def extract_cohort_number(text: str) -> Optional[int]:
     """Extract cohort number like 'Cohort 47'."""
-    match = re.search(r'Cohort\s+(\d+)', text, re.IGNORECASE)
+    match = _COHORT_RE.search(text)
     return int(match.group(1)) if match else None
 
 
@@ -69,10 +91,26 @@ def split_into_sections(text: str, separator_pattern: str = r'\n\n+') -> List[st
     return [s.strip() for s in re.split(separator_pattern, text) if s.strip()]
 
 
+@lru_cache(maxsize=128)
+def _keyword_automaton(keywords: Tuple[str, ...]):
+    """Build (once per keyword set) an Aho-Corasick automaton over keywords."""
+    automaton = ahocorasick.Automaton()
+    for keyword in keywords:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
 def contains_keywords(text: str, keywords: List[str], case_sensitive: bool = False) -> bool:
     """Check if text contains any of the keywords."""
     if not case_sensitive:
         text = text.lower()
         keywords = [k.lower() for k in keywords]
     
-    return any(keyword in text for keyword in keywords)
+    # An empty keyword matches anything; the automaton cannot hold one
+    if ahocorasick is None or not keywords or '' in keywords:
+        return any(keyword in text for keyword in keywords)
+    
+    # Single pass over text for all keywords at once
+    automaton = _keyword_automaton(tuple(sorted(set(keywords))))
+    return next(automaton.iter(text), None) is not None
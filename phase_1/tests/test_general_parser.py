@@ -0,0 +1,53 @@
+"""
+Unit tests for general program information parsing.
+"""
+import pytest
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from parsers.general_parser import GeneralParser
+
+
+class TestProgramDetails:
+    """Test suite for GeneralParser._parse_program_details."""
+    
+    @pytest.fixture
+    def parser(self):
+        """Create parser for testing."""
+        return GeneralParser()
+    
+    def test_all_details(self, parser):
+        """Test that every detail is extracted from a typical description."""
+        details = parser._parse_program_details(
+            "A 4 month fellowship: 16 weeks, 100+ Hours of live online classes."
+        )
+        
+        assert details == {
+            "total_hours": "100+ hours",
+            "duration_months": "4 months",
+            "duration_weeks": "16 weeks",
+            "format": "Live online classes",
+        }
+    
+    def test_generic_hours(self, parser):
+        """Test the fallback to any hour count."""
+        assert parser._parse_program_details("Over 60 hrs of content")["total_hours"] == "60 hrs"
+    
+    def test_overlapping_hours(self, parser):
+        """Test that "100 hours" is found inside a larger hour count."""
+        details = parser._parse_program_details("1100 hours")
+        
+        assert details["total_hours"] == "100+ hours"
+    
+    def test_first_match_of_each_detail(self, parser):
+        """Test that each detail keeps its earliest match."""
+        details = parser._parse_program_details("8 weeks then 2 weeks; 3 months or 6 months")
+        
+        assert details["duration_weeks"] == "8 weeks"
+        assert details["duration_months"] == "3 months"
+    
+    def test_no_details(self, parser):
+        """Test text without any program details."""
+        assert parser._parse_program_details("Learn product management") == {}
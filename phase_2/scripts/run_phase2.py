@@ -11,7 +11,6 @@ This script:
 """
 import sys
 from pathlib import Path
-import yaml
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
@@ -20,13 +19,13 @@ from chunking.chunker import TextChunker
 from embeddings.embedding_generator import EmbeddingGenerator
 from vector_db.chroma_client import FAISSVectorStore
 from metadata_store.sqlite_store import MetadataStore
+from utils.config_cache import load_yaml_config
 
 
 def load_config():
     """Load configuration."""
     config_path = Path(__file__).parent.parent / 'config' / 'config.yaml'
-    with open(config_path, 'r') as f:
-        return yaml.safe_load(f)
+    return load_yaml_config(config_path)
 
 
 def print_header(title: str):
@@ -62,10 +61,17 @@ def main():
     print("-" * 70)
     
     embedding_gen = EmbeddingGenerator(
-        model_name=config['embedding']['model_name']
+        model_name=config['embedding']['model_name'],
+        backend=config['embedding'].get('backend', 'torch')
     )
     
-    chunks_with_embeddings = embedding_gen.generate_chunk_embeddings(chunks)
+    # Embeddings are cached per model, keyed by chunk content hash; the cache
+    # is rebuilt when the backend or normalization differs from the last run
+    embedding_cache_path = (Path(__file__).parent.parent / 'data' / 'embedding_cache'
+                            / f"{config['embedding']['model_name'].replace('/', '_')}.npz")
+    chunks_with_embeddings, embeddings = embedding_gen.generate_chunk_embeddings(
+        chunks, cache_path=str(embedding_cache_path)
+    )
     print(f"[INFO] Embedding dimension: {embedding_gen.embedding_dimension}")
     print()
     
@@ -76,7 +82,8 @@ def main():
     faiss_path = Path(__file__).parent.parent / 'database' / 'vector_db'
     vector_store = FAISSVectorStore(
         persist_directory=str(faiss_path),
-        collection_name=config['vector_db']['collection_name']
+        collection_name=config['vector_db']['collection_name'],
+        index_type=config['vector_db'].get('index_type', 'flat')
     )
     
     # Clear existing data if any (for fresh run)
@@ -85,7 +92,8 @@ def main():
         print(f"[INFO] Collection already has {current_stats['total_chunks']} items. Clearing...")
         vector_store.clear_collection()
     
-    vector_store.add_chunks(chunks_with_embeddings)
+    vector_store.add_chunks(chunks_with_embeddings, embeddings)
+    vector_store.flush()
     
     faiss_stats = vector_store.get_collection_stats()
     print(f"[INFO] FAISS stats: {faiss_stats}")
@@ -101,6 +109,9 @@ def main():
     metadata_store.add_chunks(chunks_with_embeddings)
     metadata_store.add_instructors(phase1_data['instructors'])
     
+    # Search results are resolved from the chunks just stored
+    vector_store.metadata_db = metadata_store
+    
     sqlite_stats = metadata_store.get_stats()
     print(f"[INFO] SQLite stats:")
     for key, value in sqlite_stats.items():
@@ -118,18 +129,19 @@ def main():
         "How much does the course cost?"
     ]
     
-    for query in test_queries:
+    # Embed all test queries in a single batch
+    query_embeddings = embedding_gen.model.encode(
+        test_queries, normalize_embeddings=True, batch_size=len(test_queries)
+    )
+    
+    for query, query_embedding in zip(test_queries, query_embeddings):
         print(f"\nQuery: '{query}'")
         
-        # Generate query embedding
-        query_embedding = embedding_gen.model.encode([query], normalize_embeddings=True)[0]
-        
         # Search
-        results = vector_store.search(query_embedding.tolist(), top_k=3)
+        results = vector_store.search(query_embedding, top_k=3)
         
         print(f"Top 3 results:")
-        for i, (chunk_id, distance, doc) in enumerate(zip(results['ids'], results['distances'], results['documents'])):
-            similarity = 1 - distance  # Convert distance to similarity (for L2)
+        for i, (chunk_id, similarity, doc) in enumerate(zip(results['ids'], results['similarities'], results['documents'])):
             print(f"  {i+1}. [{chunk_id}] (similarity: {similarity:.3f})")
             # Print first 100 chars, handling Unicode safely
             try:
@@ -2,71 +2,165 @@
 Embedding generator using sentence-transformers for Phase 2.
 """
 from sentence_transformers import SentenceTransformer
+import hashlib
+from functools import lru_cache
 import numpy as np
-from typing import List, Dict
+from pathlib import Path
+from typing import List, Dict, Optional, Tuple
+
+
+@lru_cache(maxsize=2)
+def _get_model(model_name: str, backend: str, device: Optional[str]) -> SentenceTransformer:
+    """
+    Load a model once per process; later generators with the same settings
+    reuse the loaded weights and tokenizer.
+    
+    Falls back to PyTorch if the requested backend is unavailable.
+    """
+    if backend != "torch":
+        try:
+            # Non-torch backends need sentence-transformers >= 3.2 and
+            # its onnx/openvino extras
+            return SentenceTransformer(model_name, device=device, backend=backend)
+        except Exception as e:
+            print(f"[INFO] {backend} backend unavailable ({e}), using PyTorch")
+    return SentenceTransformer(model_name, device=device)
 
 
 class EmbeddingGenerator:
     """Generate semantic embeddings for text chunks."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", backend: str = "torch",
+                 device: Optional[str] = None):
         """
         Initialize embedding model.
         
         Args:
             model_name: Sentence transformer model name
+            backend: Inference backend ("torch", "onnx" or "openvino"); falls
+                back to PyTorch if the requested backend is unavailable
+            device: Device to run on (e.g. "cpu", "cuda"); auto-detected if None
         """
         print(f"[INFO] Loading embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        self.model = _get_model(model_name, backend, device)
         self.model_name = model_name
+        # The backend actually loaded (sentence-transformers < 3.2 is torch only)
+        self.backend = getattr(self.model, 'backend', 'torch')
         print(f"[OK] Model loaded successfully")
     
-    def generate_embeddings(self, texts: List[str], batch_size: int = 32, 
+    def generate_embeddings(self, texts: List[str], batch_size: Optional[int] = None, 
                            normalize: bool = True) -> np.ndarray:
         """
         Generate embeddings for a list of texts.
         
         Args:
             texts: List of text strings to embed
-            batch_size: Batch size for encoding
+            batch_size: Batch size for encoding (default: 128 on GPU, 64 on CPU)
             normalize: Whether to normalize embeddings for cosine similarity
         
         Returns:
-            numpy array of embeddings (shape: [num_texts, embedding_dim])
+            Contiguous float32 array of embeddings (shape: [num_texts, embedding_dim]),
+            passed to FAISS without a copy
         """
         print(f"[INFO] Generating embeddings for {len(texts)} texts...")
         
+        if batch_size is None:
+            batch_size = self.default_batch_size
+        
         embeddings = self.model.encode(
             texts,
             batch_size=batch_size,
             normalize_embeddings=normalize,
             show_progress_bar=True
         )
+        # A no-op for the model's usual float32 output; fixes the layout once
+        # here rather than at every consumer
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
         
         print(f"[OK] Generated embeddings with shape: {embeddings.shape}")
         return embeddings
     
-    def generate_chunk_embeddings(self, chunks: List[Dict]) -> List[Dict]:
+    def generate_chunk_embeddings(self, chunks: List[Dict], cache_path: Optional[str] = None,
+                                  normalize: bool = True) -> Tuple[List[Dict], np.ndarray]:
         """
-        Generate embeddings for chunks and attach to chunk data.
+        Generate embeddings for chunks.
+        
+        Embeddings stay in one contiguous float32 array instead of per-chunk
+        Python lists; each chunk gets the index of its row. Identical texts
+        are embedded once, and texts found in the on-disk cache are not
+        embedded at all. A cache written with a different model, backend or
+        normalize setting is ignored and overwritten.
         
         Args:
             chunks: List of chunk dictionaries with 'content' field
+            cache_path: Optional .npz file of embeddings keyed by content hash
+            normalize: Whether to normalize embeddings for cosine similarity
         
         Returns:
-            Chunks with embeddings added
+            (chunks with 'embedding_row' added, embeddings array of shape
+            [num_chunks, embedding_dim])
         """
-        # Extract text content
+        # Extract text content, keyed by content hash
         texts = [chunk['content'] for chunk in chunks]
+        keys = [hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest() for text in texts]
+        
+        settings = f"{self.model_name}|{self.backend}|normalize={normalize}"
+        cache = self._load_embedding_cache(cache_path, settings)
+        
+        # Unique texts not in the cache, in first-seen order
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cache:
+                missing.setdefault(key, text)
         
-        # Generate embeddings
-        embeddings = self.generate_embeddings(texts)
+        if missing:
+            new_embeddings = self.generate_embeddings(list(missing.values()), normalize=normalize)
+            cache.update(zip(missing, new_embeddings))
+        print(f"[INFO] {len(texts)} chunks, {len(set(keys))} unique texts, "
+              f"{len(missing)} embedded")
         
-        # Attach embeddings to chunks
+        if not keys:
+            return chunks, np.empty((0, self.embedding_dimension), dtype=np.float32)
+        
+        # Scatter the unique embeddings back to one row per chunk
+        embeddings = np.ascontiguousarray(np.stack([cache[key] for key in keys]), dtype=np.float32)
+        
+        if cache_path and missing:
+            self._save_embedding_cache(cache_path, settings, keys, embeddings)
+        
+        # Point each chunk at its embedding row
         for idx, chunk in enumerate(chunks):
-            chunk['embedding'] = embeddings[idx].tolist()
+            chunk['embedding_row'] = idx
         
-        return chunks
+        return chunks, embeddings
+    
+    @staticmethod
+    def _load_embedding_cache(cache_path: Optional[str], settings: str) -> Dict[str, np.ndarray]:
+        """Load {content hash: embedding} from an .npz cache written with these settings."""
+        if not cache_path or not Path(cache_path).exists():
+            return {}
+        with np.load(cache_path) as data:
+            cached_settings = str(data['settings']) if 'settings' in data.files else None
+            if cached_settings != settings:
+                print(f"[INFO] Embedding cache {cache_path} was written with {cached_settings}, "
+                      f"not {settings}; re-embedding")
+                return {}
+            return dict(zip(data['keys'].tolist(), data['embeddings']))
+    
+    @staticmethod
+    def _save_embedding_cache(cache_path: str, settings: str, keys: List[str], embeddings: np.ndarray):
+        """Save the current chunks' embeddings, keyed by content hash, with their settings."""
+        # Keep only this run's texts so stale entries do not accumulate
+        unique = dict(zip(keys, embeddings))
+        Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(cache_path, settings=np.array(settings), keys=np.array(list(unique)),
+                 embeddings=np.stack(list(unique.values())))
+        print(f"[OK] Saved {len(unique)} embeddings to cache {cache_path}")
+    
+    @property
+    def default_batch_size(self) -> int:
+        """Encoding batch size suited to the model's device."""
+        return 128 if self.model.device.type == 'cuda' else 64
     
     @property
     def embedding_dimension(self) -> int:
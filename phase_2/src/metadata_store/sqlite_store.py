@@ -1,10 +1,56 @@
 """
 SQLite metadata store for Phase 2.
 """
+import asyncio
 import sqlite3
 import json
+import threading
+import weakref
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
+
+# Connection settings: WAL lets readers run alongside a writer and, with
+# synchronous=NORMAL, fsyncs only at checkpoints; temp tables stay in memory,
+# the page cache is ~64 MB and up to 256 MB of the file is memory-mapped
+_PRAGMAS = (
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA temp_store=MEMORY',
+    'PRAGMA cache_size=-64000',
+    'PRAGMA mmap_size=268435456',
+)
+
+# Metadata keys that also have their own (indexed) column in the chunks table
+_COLUMN_KEYS = frozenset(('source', 'category', 'week'))
+# Metadata JSON keys used as filters, each with an expression index
+_JSON_INDEX_KEYS = ('instructor_name', 'tool_category')
+
+
+def _json_field_sql(key: str) -> str:
+    """SQL expression reading key from the metadata JSON, as written in its index."""
+    return f"json_extract(metadata, '$.\"{key}\"')"
+
+
+# Insert statements shared by the bulk add_* methods
+_INSERT_CHUNK_SQL = '''
+    INSERT OR REPLACE INTO chunks 
+    (chunk_id, content, source, category, week, metadata)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+_INSERT_INSTRUCTOR_SQL = '''
+    INSERT OR REPLACE INTO instructors (name, title, background, teaches)
+    VALUES (?, ?, ?, ?)
+'''
+
+
+class _ThreadConnection:
+    """One thread's connection and cursor (weak-referenceable, unlike sqlite3.Connection)."""
+    
+    __slots__ = ('conn', 'cursor', '__weakref__')
+    
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.cursor = conn.cursor()
 
 
 class MetadataStore:
@@ -21,13 +67,51 @@ class MetadataStore:
         Path(db_path).parent.mkdir(parents=True, exist_ok=True)
         
         print(f"[INFO] Initializing SQLite metadata store: {db_path}")
-        self.conn = sqlite3.connect(db_path)
-        self.conn.row_factory = sqlite3.Row
-        self.cursor = self.conn.cursor()
+        # Search threads (Flask, Streamlit) share the store, so each thread
+        # opens its own connection on first use instead of contending for one;
+        # a connection is closed when its thread exits, or by close()
+        self._local = threading.local()
+        self._connections = weakref.WeakSet()
+        
+        # Lookup indexes are built once the first batch of chunks is loaded
+        self._indexed = False
+        # Callbacks run after chunk rows are written
+        self._listeners: List[Callable[[], None]] = []
         
         self._create_tables()
+        # A database loaded by an earlier version gets any missing indexes now
+        if self.conn.execute('SELECT 1 FROM chunks LIMIT 1').fetchone():
+            self.finalize_ingest()
         print(f"[OK] Metadata store initialized")
     
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """This thread's database connection."""
+        return self._thread_connection().conn
+    
+    @property
+    def cursor(self) -> sqlite3.Cursor:
+        """This thread's cursor on its connection."""
+        return self._thread_connection().cursor
+    
+    def _thread_connection(self) -> _ThreadConnection:
+        """Return this thread's connection, opening and configuring it on first use."""
+        handle = getattr(self._local, 'handle', None)
+        if handle is None:
+            # close() may run on another thread than the one that opened it
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._configure_pragmas(conn)
+            conn.row_factory = sqlite3.Row
+            handle = self._local.handle = _ThreadConnection(conn)
+            self._connections.add(handle)
+        return handle
+    
+    @staticmethod
+    def _configure_pragmas(conn: sqlite3.Connection):
+        """Apply journal, sync and cache settings to a new connection."""
+        for pragma in _PRAGMAS:
+            conn.execute(pragma)
+    
     def _create_tables(self):
         """Create database tables."""
         # Chunks table
@@ -64,12 +148,32 @@ class MetadataStore:
             )
         ''')
         
-        # Create indexes
-        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_category ON chunks(category)')
-        self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_week ON chunks(week)')
-        
         self.conn.commit()
     
+    def _create_indexes(self):
+        """Create lookup indexes on the chunks table's filter columns and JSON keys."""
+        with self.conn:
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_category ON chunks(category)')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_week ON chunks(week)')
+            self.cursor.execute('CREATE INDEX IF NOT EXISTS idx_source ON chunks(source)')
+            for key in _JSON_INDEX_KEYS:
+                self.cursor.execute(
+                    f'CREATE INDEX IF NOT EXISTS idx_meta_{key} ON chunks({_json_field_sql(key)})'
+                )
+        self._indexed = True
+    
+    def finalize_ingest(self):
+        """
+        Build the lookup indexes if they do not exist yet.
+        
+        Called automatically after the first add_chunks batch, so that batch
+        is inserted without index maintenance and each index is built once
+        over the loaded rows, and when opening a database that already has
+        chunks. Indexes already present are left as they are.
+        """
+        if not self._indexed:
+            self._create_indexes()
+    
     def add_chunks(self, chunks: List[Dict]):
         """
         Add chunks to database.
@@ -79,40 +183,50 @@ class MetadataStore:
         """
         print(f"\n[INFO] Adding {len(chunks)} chunks to SQLite...")
         
-        for chunk in chunks:
-            metadata_json = json.dumps(chunk.get('metadata', {}))
-            week = chunk.get('metadata', {}).get('week')
-            
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO chunks 
-                (chunk_id, content, source, category, week, metadata)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                chunk['chunk_id'],
-                chunk['content'],
-                chunk.get('metadata', {}).get('source'),
-                chunk.get('metadata', {}).get('category'),
-                week,
-                metadata_json
-            ))
+        # One prepared statement bound to every row, committed (or rolled
+        # back on error) as a single transaction
+        with self.conn:
+            self.cursor.executemany(_INSERT_CHUNK_SQL, [self._chunk_row(chunk) for chunk in chunks])
         
-        self.conn.commit()
+        self.finalize_ingest()
+        self._notify_listeners()
         print(f"[OK] Successfully added {len(chunks)} chunks to SQLite")
     
+    def add_listener(self, callback: Callable[[], None]):
+        """
+        Register callback() to run whenever chunk rows change.
+        
+        Used to invalidate caches of retrieved chunks; it runs after
+        add_chunks inserts or replaces rows.
+        """
+        self._listeners.append(callback)
+    
+    def _notify_listeners(self):
+        """Tell the registered listeners that chunk rows changed."""
+        for callback in self._listeners:
+            callback()
+    
+    @staticmethod
+    def _chunk_row(chunk: Dict) -> Tuple:
+        """Parameter tuple for _INSERT_CHUNK_SQL."""
+        metadata = chunk.get('metadata', {})
+        return (
+            chunk['chunk_id'],
+            chunk['content'],
+            metadata.get('source'),
+            metadata.get('category'),
+            metadata.get('week'),
+            json.dumps(metadata)
+        )
+    
     def add_instructors(self, instructors: List[Dict]):
         """Add instructors to database."""
-        for inst in instructors:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO instructors (name, title, background, teaches)
-                VALUES (?, ?, ?, ?)
-            ''', (
-                inst['name'],
-                inst.get('title', ''),
-                inst.get('background', ''),
-                inst.get('teaches', '')
-            ))
+        with self.conn:
+            self.cursor.executemany(_INSERT_INSTRUCTOR_SQL, [
+                (inst['name'], inst.get('title', ''), inst.get('background', ''), inst.get('teaches', ''))
+                for inst in instructors
+            ])
         
-        self.conn.commit()
         print(f"[OK] Added {len(instructors)} instructors to SQLite")
     
     def get_chunk_by_id(self, chunk_id: str) -> Optional[Dict]:
@@ -124,6 +238,53 @@ class MetadataStore:
             return dict(row)
         return None
     
+    def get_many(self, chunk_ids: List[str]) -> Dict[str, Dict]:
+        """Get several chunks in one query, keyed by chunk ID (unknown IDs are left out)."""
+        if not chunk_ids:
+            return {}
+        placeholders = ', '.join('?' * len(chunk_ids))
+        rows = self.conn.execute(
+            f'SELECT * FROM chunks WHERE chunk_id IN ({placeholders})', list(chunk_ids)
+        ).fetchall()
+        return {row['chunk_id']: dict(row) for row in rows}
+    
+    async def aget_many(self, chunk_ids: List[str]) -> Dict[str, Dict]:
+        """
+        get_many for asyncio callers, run on a worker thread with its own connection.
+        
+        The event loop keeps serving (e.g. preparing the LLM request) while
+        SQLite reads; the sqlite3 module releases the GIL during the query.
+        """
+        if not chunk_ids:
+            return {}
+        return await asyncio.to_thread(self.get_many, chunk_ids)
+    
+    def get_chunk_ids_matching(self, filters: Dict) -> List[str]:
+        """
+        Get IDs of chunks whose metadata has every key/value in filters.
+        
+        source, category and week use their columns; other keys are read
+        from the metadata JSON, through an expression index for the keys in
+        _JSON_INDEX_KEYS.
+        """
+        clauses = []
+        params = []
+        for key, value in filters.items():
+            if key in _COLUMN_KEYS:
+                clauses.append(f'{key} = ?')
+            elif key in _JSON_INDEX_KEYS:
+                # The path must be a literal for SQLite to match the index
+                clauses.append(f'{_json_field_sql(key)} = ?')
+            else:
+                clauses.append('json_extract(metadata, ?) = ?')
+                params.append(f'$."{key}"')
+            params.append(value)
+        
+        sql = 'SELECT chunk_id FROM chunks'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        return [row[0] for row in self.conn.execute(sql, params)]
+    
     def get_chunks_by_category(self, category: str) -> List[Dict]:
         """Get all chunks in a category."""
         self.cursor.execute('SELECT * FROM chunks WHERE category = ?', (category,))
@@ -153,8 +314,11 @@ class MetadataStore:
         return stats
     
     def close(self):
-        """Close database connection."""
-        self.conn.close()
+        """Close the database connections of all threads."""
+        for handle in list(self._connections):
+            handle.conn.close()
+        self._connections.clear()
+        self._local = threading.local()
 
 
 if __name__ == "__main__":
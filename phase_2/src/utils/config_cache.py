@@ -0,0 +1,33 @@
+"""
+Cached YAML config loading.
+"""
+import copy
+import os
+from functools import lru_cache
+from typing import Any, Dict
+
+import yaml
+
+# Prefer the libyaml C loader; same safe semantics, much faster parsing
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+
+@lru_cache(maxsize=100)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int) -> Any:
+    """Parse a YAML file; mtime/size are part of the key so edits invalidate it."""
+    with open(path, 'r') as f:
+        return yaml.load(f, Loader=SafeLoader)
+
+
+def load_yaml_config(config_path) -> Dict:
+    """
+    Load a YAML config file, parsing it only when it has changed on disk.
+    
+    Returns a deep copy, so callers may modify the result freely.
+    """
+    path = os.path.abspath(config_path)
+    stat = os.stat(path)
+    return copy.deepcopy(_load_yaml_cached(path, stat.st_mtime_ns, stat.st_size))
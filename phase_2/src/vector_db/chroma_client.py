@@ -1,26 +1,71 @@
 """
 FAISS vector database client for Phase 2 (ChromaDB alternative for Python 3.14 compatibility).
 """
+import atexit
 import faiss
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pickle
 import json
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Sequence, Tuple, Union
+
+from metadata_store.sqlite_store import MetadataStore
 
 
 class FAISSVectorStore:
     """FAISS-based vector store for embedding storage and retrieval."""
     
+    # Index types a new index can be built as; an existing index is loaded as saved
+    INDEX_TYPES = ("flat", "sq8", "hnsw", "ivf", "pq")
+    
+    # HNSW graph degree and build/search beam widths
+    hnsw_m = 32
+    ef_construction = 200
+    ef_search = 64
+    # IVF cell count (capped by the training set size) and cells probed per query
+    ivf_nlist = 1000
+    ivf_nprobe = 30
+    # "pq" index: OPQ-rotated product quantizer with pq_m one-byte codes per
+    # vector, in pq_nlist IVF cells (capped by the training set size)
+    pq_m = 32
+    pq_nlist = 256
+    # Flat indexes at least this large answer a single unfiltered query by
+    # searching slabs of the database in parallel
+    parallel_search_min = 50_000
+    
     def __init__(self, persist_directory: str = "database/vector_db", 
-                 collection_name: str = "nextleap_course_v1"):
+                 collection_name: str = "nextleap_course_v1",
+                 index_type: str = "flat",
+                 mmap: bool = False,
+                 metadata_db: Optional[MetadataStore] = None,
+                 nprobe: Optional[int] = None,
+                 ef_search: Optional[int] = None):
         """
         Initialize FAISS vector store.
         
         Args:
             persist_directory: Path to persist FAISS data
             collection_name: Name of the collection
+            index_type: Index built on first add_chunks: "flat" (exact scan),
+                "sq8" (scan over int8-quantized vectors, a quarter of the
+                memory), "hnsw" or "ivf" (approximate, sublinear for large
+                collections) or "pq" (IVF over pq_m-byte product-quantized
+                codes, for collections over ~100k vectors)
+            mmap: Memory-map a saved index read-only instead of loading it,
+                so the OS page cache (shared between processes) holds the
+                vectors; it is loaded into memory if chunks are added
+            metadata_db: SQLite store holding each chunk's content and
+                metadata, looked up by chunk ID for search results and
+                filters; can also be assigned later
+            nprobe: IVF cells probed per query for "ivf" and "pq" indexes
+                (default ivf_nprobe); more is slower with better recall
+            ef_search: HNSW search beam width for "hnsw" indexes (default
+                ef_search); more is slower with better recall
         """
+        if index_type not in self.INDEX_TYPES:
+            raise ValueError(f"Unknown index_type {index_type!r}, expected one of {self.INDEX_TYPES}")
+        
         print(f"[INFO] Initializing FAISS vector store...")
         print(f"[INFO] Persist directory: {persist_directory}")
         
@@ -28,9 +73,34 @@ class FAISSVectorStore:
         self.persist_directory.mkdir(parents=True, exist_ok=True)
         
         self.collection_name = collection_name
+        self.index_type = index_type
+        if nprobe is not None:
+            self.ivf_nprobe = nprobe
+        if ef_search is not None:
+            self.ef_search = ef_search
+        self.mmap = mmap
+        # Whether self.index is a read-only view of the index file
+        self._mapped = False
         self.index = None
-        self.metadata_store = []  # Store metadata for each vector
+        self.metadata_db = metadata_db
+        # chunk_id of each vector, by FAISS id; content and metadata live in metadata_db
+        self.ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        # Category and week of each vector, by FAISS id, so common filters
+        # are a NumPy mask instead of a metadata lookup (week -1 if unset);
+        # None for stores saved without them, which filter through metadata_db
+        self.categories: Optional[np.ndarray] = np.array([], dtype=str)
+        self.weeks: Optional[np.ndarray] = np.array([], dtype='int32')
+        self._reset_category_buckets()
         self.dimension = None
+        # Set when the in-memory index has changes not yet written by flush()
+        self._dirty = False
+        # Called after vectors are added or the collection is cleared (see add_listener)
+        self._listeners: List[Callable[[], None]] = []
+        # Threads for _search_db_parallel, started on first use, and the
+        # number of slabs (one per thread) a search is split into
+        self._slab_executor: Optional[ThreadPoolExecutor] = None
+        self._slab_workers = 0
         
         # Try to load existing index
         self._load_index()
@@ -41,126 +111,565 @@ class FAISSVectorStore:
         """Get path to FAISS index file."""
         return self.persist_directory / f"{self.collection_name}.index"
     
+    def _get_ids_path(self) -> Path:
+        """Get path to the chunk ID array."""
+        return self.persist_directory / f"{self.collection_name}_ids.npy"
+    
+    def _get_categories_path(self) -> Path:
+        """Get path to the per-vector category array."""
+        return self.persist_directory / f"{self.collection_name}_categories.npy"
+    
+    def _get_weeks_path(self) -> Path:
+        """Get path to the per-vector week array."""
+        return self.persist_directory / f"{self.collection_name}_weeks.npy"
+    
     def _get_metadata_path(self) -> Path:
-        """Get path to metadata file."""
+        """Get path to the metadata pickle written by earlier versions."""
         return self.persist_directory / f"{self.collection_name}_metadata.pkl"
     
     def _load_index(self):
         """Load existing FAISS index if it exists."""
         index_path = self._get_index_path()
+        ids_path = self._get_ids_path()
         metadata_path = self._get_metadata_path()
         
-        if index_path.exists() and metadata_path.exists():
+        if index_path.exists() and (ids_path.exists() or metadata_path.exists()):
             print(f"[INFO] Loading existing FAISS index from {index_path}")
-            self.index = faiss.read_index(str(index_path))
+            self.index = self._read_index(index_path)
+            self._apply_search_params()
             
-            with open(metadata_path, 'rb') as f:
-                self.metadata_store = pickle.load(f)
+            if ids_path.exists():
+                self._set_ids(np.load(ids_path, allow_pickle=False).tolist())
+                categories_path = self._get_categories_path()
+                weeks_path = self._get_weeks_path()
+                if categories_path.exists() and weeks_path.exists():
+                    # Mapped alongside the index so worker processes share the pages
+                    mmap_mode = 'r' if self.mmap else None
+                    self.categories = np.load(categories_path, mmap_mode=mmap_mode, allow_pickle=False)
+                    self.weeks = np.load(weeks_path, mmap_mode=mmap_mode, allow_pickle=False)
+                else:
+                    self.categories = self.weeks = None
+            else:
+                # Older stores pickled every chunk; only the IDs and filter
+                # columns are needed
+                with open(metadata_path, 'rb') as f:
+                    entries = pickle.load(f)
+                self._set_ids([entry['chunk_id'] for entry in entries])
+                self.categories, self.weeks = self._filter_columns(entries)
+            self._reset_category_buckets()
             
             self.dimension = self.index.d
             print(f"[OK] Loaded index with {self.index.ntotal} vectors")
     
+    def _set_ids(self, ids: List[str]):
+        """Replace the chunk ID list and its chunk_id -> FAISS id lookup."""
+        self.ids = ids
+        self._positions = {chunk_id: idx for idx, chunk_id in enumerate(ids)}
+    
+    def _reset_category_buckets(self):
+        """Drop the per-category id buckets, rebuilt from self.categories on the next filtered search."""
+        # category -> sorted FAISS ids, and the FAISS selector built from them
+        self._cat_to_ids: Optional[Dict[str, np.ndarray]] = None
+        self._cat_selectors: Dict[str, faiss.IDSelector] = {}
+    
+    @staticmethod
+    def _filter_columns(chunks: List[Dict]):
+        """Category and week arrays for chunks, from each chunk's 'metadata'."""
+        metadatas = [chunk.get('metadata') or {} for chunk in chunks]
+        categories = np.array([m.get('category') or '' for m in metadatas], dtype=str)
+        weeks = np.array([
+            m['week'] if isinstance(m.get('week'), int) else -1 for m in metadatas
+        ], dtype='int32')
+        return categories, weeks
+    
+    def _read_index(self, index_path: Path) -> faiss.Index:
+        """Read an index file, memory-mapped if self.mmap and supported."""
+        self._mapped = False
+        if self.mmap:
+            # IO_FLAG_MMAP_IFC maps the vector codes of flat, SQ and HNSW
+            # indexes (faiss >= 1.10); otherwise fall back to a full load
+            mmap_flag = getattr(faiss, 'IO_FLAG_MMAP_IFC', None)
+            if mmap_flag is not None:
+                try:
+                    index = faiss.read_index(str(index_path), mmap_flag | faiss.IO_FLAG_READ_ONLY)
+                    self._mapped = True
+                    return index
+                except RuntimeError as e:
+                    print(f"[INFO] Could not memory-map index ({e}), loading it")
+        return faiss.read_index(str(index_path))
+    
     def _save_index(self):
-        """Save FAISS index to disk."""
+        """Save FAISS index and chunk IDs to disk."""
         index_path = self._get_index_path()
         metadata_path = self._get_metadata_path()
         
-        faiss.write_index(self.index, str(index_path))
+        # Write to a temporary file and rename it into place, so processes
+        # that have the old file memory-mapped keep a consistent view
+        tmp_path = index_path.with_name(index_path.name + '.tmp')
+        faiss.write_index(self.index, str(tmp_path))
+        tmp_path.replace(index_path)
         
-        with open(metadata_path, 'wb') as f:
-            pickle.dump(self.metadata_store, f)
+        np.save(self._get_ids_path(), np.array(self.ids, dtype=str))
+        if self.categories is not None:
+            np.save(self._get_categories_path(), self.categories)
+            np.save(self._get_weeks_path(), self.weeks)
+        # The ID array supersedes a metadata pickle from an earlier version
+        if metadata_path.exists():
+            metadata_path.unlink()
         
         print(f"[OK] Saved FAISS index to {index_path}")
     
-    def add_chunks(self, chunks: List[Dict]):
+    def flush(self):
+        """Write the index and chunk IDs to disk if they changed since the last flush."""
+        if self._dirty and self.index is not None:
+            self._save_index()
+        self._set_clean()
+    
+    def _set_dirty(self):
+        """
+        Mark the in-memory index as changed since the last flush.
+        
+        Until flushed, the store is also flushed at interpreter exit; stores
+        without pending changes (e.g. read-only mapped ones) are not kept
+        alive by an exit hook.
+        """
+        if not self._dirty:
+            self._dirty = True
+            atexit.register(self.flush)
+    
+    def _set_clean(self):
+        """Mark the index as saved (or discarded), dropping the exit hook."""
+        if self._dirty:
+            self._dirty = False
+            atexit.unregister(self.flush)
+    
+    def add_chunks(self, chunks: List[Dict], embeddings: Optional[np.ndarray] = None):
         """
         Add chunks with embeddings to FAISS.
         
+        Changes are kept in memory until flush() (or interpreter exit).
+        
+        Only chunk IDs and the category/week filter columns are kept here;
+        the chunks themselves are stored with MetadataStore.add_chunks.
+        
         Args:
-            chunks: List of chunks with 'chunk_id', 'content', 'embedding', and 'metadata'
+            chunks: List of chunks with 'chunk_id' and 'metadata'
+            embeddings: Array of shape [len(chunks), dim], row i belonging to
+                chunks[i]; if omitted, each chunk's 'embedding' list is used
         """
         print(f"\n[INFO] Adding {len(chunks)} chunks to FAISS...")
         
-        # Extract embeddings
-        embeddings = np.array([chunk['embedding'] for chunk in chunks], dtype='float32')
+        # FAISS takes a contiguous float32 matrix directly; copied so that
+        # normalizing below leaves the caller's array untouched
+        if embeddings is None:
+            embeddings = np.array([chunk['embedding'] for chunk in chunks], dtype='float32')
+        else:
+            embeddings = np.array(embeddings, dtype='float32', order='C')
+        
+        # Inner product equals cosine similarity only for unit vectors
+        faiss.normalize_L2(embeddings)
+        
+        # A mapped index is a read-only view; load it to be able to add
+        if self._mapped:
+            self.mmap = False
+            self.index = self._read_index(self._get_index_path())
+            self._apply_search_params()
         
         # Initialize index if not done yet
         if self.index is None:
             self.dimension = embeddings.shape[1]
-            # Use L2 distance (can also use faiss.METRIC_INNER_PRODUCT for cosine similarity with normalized vectors)
-            self.index = faiss.IndexFlatL2(self.dimension)
-            print(f"[INFO] Created FAISS index with dimension {self.dimension}")
+            self.index = self._create_index(embeddings)
+            print(f"[INFO] Created FAISS {self.index_type} index with dimension {self.dimension}")
         
         # Add vectors to index
         self.index.add(embeddings)
         
-        # Store metadata
+        # Extend the filter columns once per batch; a store saved without
+        # them keeps filtering through metadata_db
+        if self.categories is not None:
+            categories, weeks = self._filter_columns(chunks)
+            self.categories = np.concatenate([self.categories, categories])
+            self.weeks = np.concatenate([self.weeks, weeks])
+            self._reset_category_buckets()
+        
+        # Remember which chunk each new vector belongs to
         for chunk in chunks:
-            self.metadata_store.append({
-                'chunk_id': chunk['chunk_id'],
-                'content': chunk['content'],
-                'metadata': chunk['metadata']
-            })
+            self._positions[chunk['chunk_id']] = len(self.ids)
+            self.ids.append(chunk['chunk_id'])
         
-        # Save to disk
-        self._save_index()
+        # Written to disk by flush(), once per ingest rather than per batch
+        self._set_dirty()
+        
+        self._notify_listeners()
         
         print(f"[OK] Successfully added {len(chunks)} chunks to FAISS")
         print(f"[INFO] Total vectors in index: {self.index.ntotal}")
     
-    def search(self, query_embedding: List[float], top_k: int = 5, 
+    def rebuild_index(self):
+        """
+        Rebuild the index as self.index_type over its own stored vectors and save it.
+        
+        Converts a store written by an earlier version (L2 index, metadata
+        pickle) to the current format: normalized vectors in an
+        inner-product index, whose scores are the cosine similarity, plus
+        the chunk ID and filter column arrays.
+        """
+        if self.index is None or self.index.ntotal == 0:
+            print("[WARNING] Index is empty, nothing to rebuild")
+            return
+        
+        print(f"[INFO] Rebuilding {self.index.ntotal} vectors as a {self.index_type} index...")
+        vectors = self.index.reconstruct_n(0, self.index.ntotal)
+        faiss.normalize_L2(vectors)
+        
+        self._mapped = False
+        self.index = self._create_index(vectors)
+        self.index.add(vectors)
+        self._set_dirty()
+        self._notify_listeners()
+        self.flush()
+    
+    def add_listener(self, callback: Callable[[], None]):
+        """
+        Register callback() to run whenever the indexed vectors change.
+        
+        Used to invalidate caches of search results; it runs after
+        add_chunks and clear_collection.
+        """
+        self._listeners.append(callback)
+    
+    def _notify_listeners(self):
+        """Tell the registered listeners that the indexed vectors changed."""
+        for callback in self._listeners:
+            callback()
+    
+    def _require_metadata_db(self) -> MetadataStore:
+        """Return metadata_db, which searches need to resolve chunk IDs."""
+        if self.metadata_db is None:
+            raise ValueError("FAISSVectorStore needs a metadata_db to look up chunk content and metadata")
+        return self.metadata_db
+    
+    def _matching_ids(self, filter_metadata: Dict) -> np.ndarray:
+        """Sorted FAISS ids of the vectors whose chunk metadata has every key/value in filter_metadata."""
+        mask = self._column_mask(filter_metadata)
+        if mask is not None:
+            return np.flatnonzero(mask).astype('int64')
+        
+        chunk_ids = self._require_metadata_db().get_chunk_ids_matching(filter_metadata)
+        positions = [self._positions[c] for c in chunk_ids if c in self._positions]
+        return np.array(sorted(positions), dtype='int64')
+    
+    def _category_ids(self, category: str) -> np.ndarray:
+        """Sorted FAISS ids of the vectors in category, from the per-category buckets."""
+        if self._cat_to_ids is None:
+            # A stable sort groups each category's ids, keeping them in order
+            order = np.argsort(self.categories, kind='stable').astype('int64')
+            names, starts = np.unique(self.categories[order], return_index=True)
+            self._cat_to_ids = dict(zip(names.tolist(), np.split(order, starts[1:])))
+        return self._cat_to_ids.get(category, np.array([], dtype='int64'))
+    
+    def _filter_selector(self, filter_metadata: Dict) -> Tuple[Optional[faiss.IDSelector], int]:
+        """
+        FAISS selector for the vectors matching filter_metadata, and how many match.
+        
+        A filter on category alone, the common case, uses that category's
+        bucket and a selector built once per category; the selector is None
+        when nothing matches.
+        """
+        category = filter_metadata.get('category')
+        if (self.categories is not None and len(filter_metadata) == 1
+                and isinstance(category, str) and category):
+            ids = self._category_ids(category)
+            selector = self._cat_selectors.get(category)
+            if selector is None and len(ids):
+                selector = self._cat_selectors[category] = faiss.IDSelectorBatch(ids)
+            return selector, len(ids)
+        
+        ids = self._matching_ids(filter_metadata)
+        return (faiss.IDSelectorBatch(ids) if len(ids) else None), len(ids)
+    
+    def _column_mask(self, filter_metadata: Dict) -> Optional[np.ndarray]:
+        """
+        Boolean mask over FAISS ids for filter_metadata, or None if the
+        category/week columns cannot answer it and metadata_db must.
+        """
+        if self.categories is None:
+            return None
+        
+        mask = np.ones(len(self.ids), dtype=bool)
+        for key, value in filter_metadata.items():
+            if key == 'category' and isinstance(value, str) and value:
+                mask &= self.categories == value
+            elif key == 'week' and isinstance(value, int) and not isinstance(value, bool) and value >= 0:
+                mask &= self.weeks == value
+            else:
+                return None
+        return mask
+    
+    def _search_params(self, selector: faiss.IDSelector) -> faiss.SearchParameters:
+        """Search parameters restricting the search to selector, keeping the index's search breadth."""
+        if isinstance(self.index, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(sel=selector, efSearch=self.index.hnsw.efSearch)
+        ivf = faiss.try_extract_index_ivf(self.index)
+        if ivf is not None:
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+            if isinstance(self.index, faiss.IndexPreTransform):
+                # The selector applies to the IVF index behind the rotation
+                return faiss.SearchParametersPreTransform(index_params=params)
+            return params
+        return faiss.SearchParameters(sel=selector)
+    
+    def _create_index(self, embeddings: np.ndarray) -> faiss.Index:
+        """
+        Build an empty index of self.index_type, training it on embeddings if needed.
+        
+        Stored vectors are unit-normalized, so every type uses inner product,
+        which is cosine similarity.
+        """
+        metric = faiss.METRIC_INNER_PRODUCT
+        
+        if self.index_type == "sq8":
+            # One byte per dimension; per-dimension ranges are learned from embeddings
+            index = faiss.IndexScalarQuantizer(
+                self.dimension, faiss.ScalarQuantizer.QT_8bit, metric
+            )
+            index.train(embeddings)
+        elif self.index_type == "hnsw":
+            index = faiss.IndexHNSWFlat(self.dimension, self.hnsw_m, metric)
+            index.hnsw.efConstruction = self.ef_construction
+        elif self.index_type == "ivf":
+            # k-means wants at least 39 training vectors per cell
+            nlist = max(1, min(self.ivf_nlist, len(embeddings) // 39))
+            quantizer = faiss.IndexFlatIP(self.dimension)
+            index = faiss.IndexIVFFlat(quantizer, self.dimension, nlist, metric)
+            index.train(embeddings)
+        elif self.index_type == "pq" and len(embeddings) >= 39 * 256 and self.dimension % self.pq_m == 0:
+            # Rotation (OPQ) and codebooks are learned from embeddings; each
+            # sub-quantizer's k-means wants 39 training vectors per 8-bit code
+            nlist = max(1, min(self.pq_nlist, len(embeddings) // 39))
+            index = faiss.index_factory(
+                self.dimension, f"OPQ{self.pq_m},IVF{nlist},PQ{self.pq_m}", metric
+            )
+            index.train(embeddings)
+        else:
+            if self.index_type == "pq":
+                print(f"[INFO] Too few vectors (or dimension not divisible by {self.pq_m}) to train PQ, using a flat index")
+            index = faiss.IndexFlatIP(self.dimension)
+        
+        self.index = index
+        self._apply_search_params()
+        return index
+    
+    def _apply_search_params(self):
+        """Set query-time search breadth on approximate indexes."""
+        if isinstance(self.index, faiss.IndexHNSW):
+            self.index.hnsw.efSearch = self.ef_search
+        else:
+            ivf = faiss.try_extract_index_ivf(self.index)
+            if ivf is not None:
+                ivf.nprobe = min(self.ivf_nprobe, ivf.nlist)
+    
+    def search(self, query_embedding: Union[np.ndarray, Sequence[float]], top_k: int = 5, 
                filter_metadata: Optional[Dict] = None) -> Dict:
         """
         Search for similar chunks.
         
         Args:
-            query_embedding: Query embedding vector
+            query_embedding: Query embedding vector (a float32 ndarray is used without copying)
             top_k: Number of results to return
             filter_metadata: Optional metadata filters (e.g., {"category": "curriculum"})
         
         Returns:
-            Dictionary with ids, distances, documents, and metadatas
+            Dictionary with ids, distances (raw index scores), similarities
+            (cosine similarity), documents, and metadatas
+        """
+        # FAISS wants a contiguous float32 [1, dim] matrix; a float32
+        # ndarray is reshaped as a view, anything else is converted once
+        query_vector = np.ascontiguousarray(query_embedding, dtype='float32').reshape(1, -1)
+        return self.search_batch(query_vector, top_k, filter_metadata)[0]
+    
+    def search_batch(self, query_embeddings: np.ndarray, top_k: int = 5,
+                     filter_metadata: Union[Dict, Sequence[Optional[Dict]], None] = None) -> List[Dict]:
+        """
+        Search for similar chunks for several queries at once.
+        
+        Queries sharing a filter go to FAISS in one call, which spreads them
+        over its OpenMP threads, and all hits are fetched in one metadata lookup.
+        
+        Args:
+            query_embeddings: Query vectors of shape [num_queries, dim]
+            top_k: Number of results to return per query
+            filter_metadata: Optional metadata filters applied to every query,
+                or a list with one filter (or None) per query
+        
+        Returns:
+            One result dictionary per query, as returned by search()
         """
+        hits = self.search_ids_batch(query_embeddings, top_k, filter_metadata)
+        
+        # Fetch only the hits' rows, for every query in one lookup
+        wanted = list({chunk_id for hit in hits for chunk_id in hit["ids"]})
+        rows = self._require_metadata_db().get_many(wanted) if wanted else {}
+        
+        results = []
+        for hit in hits:
+            # Get results
+            result = self._empty_result()
+            for chunk_id, distance, similarity in zip(hit["ids"], hit["distances"], hit["similarities"]):
+                row = rows.get(chunk_id)
+                if row is None:
+                    # Chunk removed from the metadata store since it was indexed
+                    continue
+                
+                result["ids"].append(chunk_id)
+                result["documents"].append(row['content'])
+                result["metadatas"].append(json.loads(row['metadata']))
+                result["distances"].append(distance)
+                result["similarities"].append(similarity)
+            
+            results.append(result)
+        
+        return results
+    
+    def search_ids_batch(self, query_embeddings: np.ndarray, top_k: int = 5,
+                         filter_metadata: Union[Dict, Sequence[Optional[Dict]], None] = None) -> List[Dict]:
+        """
+        Nearest-neighbour search returning chunk IDs and scores only.
+        
+        Content and metadata are left to the caller to fetch for just these
+        hits (e.g. with MetadataStore.get_many). Arguments are as for
+        search_batch.
+        
+        Returns:
+            One dictionary per query with ids, distances and similarities
+        """
+        query_vectors = np.ascontiguousarray(query_embeddings, dtype='float32')
+        if query_vectors.ndim == 1:
+            query_vectors = query_vectors.reshape(1, -1)
+        # Inner product is cosine similarity only for unit vectors; queries
+        # embedded with normalize_embeddings already are, others are
+        # normalized into a new array, leaving the caller's untouched
+        norms = np.linalg.norm(query_vectors, axis=1, keepdims=True)
+        if not np.allclose(norms, 1.0, atol=1e-3):
+            query_vectors = query_vectors / np.maximum(norms, 1e-12)
+        num_queries = len(query_vectors)
+        hits = [{"ids": [], "distances": [], "similarities": []} for _ in range(num_queries)]
+        
         if self.index is None or self.index.ntotal == 0:
             print("[WARNING] Index is empty")
-            return {"ids": [], "distances": [], "documents": [], "metadatas": []}
+            return hits
+        
+        # Group the queries by filter, one FAISS search per group
+        if filter_metadata is None or isinstance(filter_metadata, dict):
+            groups = [(filter_metadata, np.arange(num_queries))]
+        else:
+            by_filter = {}
+            for q, query_filter in enumerate(filter_metadata):
+                key = tuple(sorted((query_filter or {}).items()))
+                by_filter.setdefault(key, (query_filter, []))[1].append(q)
+            groups = [(query_filter, np.array(rows)) for query_filter, rows in by_filter.values()]
         
-        # Convert query to numpy array
-        query_vector = np.array([query_embedding], dtype='float32')
+        for query_filter, rows in groups:
+            found = self._search_group(query_vectors[rows], top_k, query_filter)
+            if found is None:
+                continue
+            distances, similarities, indices = found
+            # Approximate indexes pad with -1 when they find fewer than k
+            valid = (indices >= 0) & (indices < len(self.ids))
+            for j, q in enumerate(rows):
+                # One conversion per array to Python floats and ints
+                hits[q] = {
+                    "ids": [self.ids[idx] for idx in indices[j][valid[j]].tolist()],
+                    "distances": distances[j][valid[j]].tolist(),
+                    "similarities": similarities[j][valid[j]].tolist()
+                }
+        
+        return hits
+    
+    def _search_group(self, query_vectors: np.ndarray, top_k: int,
+                      filter_metadata: Optional[Dict]) -> Optional[Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+        """
+        Run one FAISS search for queries sharing a filter.
+        
+        Returns:
+            (distances, similarities, FAISS ids), each [num_queries, k], or
+            None if no vector matches the filter
+        """
+        # Metadata filters are applied inside the FAISS search, so the
+        # result is the true top_k among the matching vectors
+        k = min(top_k, self.index.ntotal)
+        params = None
+        if filter_metadata:
+            selector, num_matching = self._filter_selector(filter_metadata)
+            if num_matching == 0:
+                return None
+            k = min(k, num_matching)
+            params = self._search_params(selector)
         
         # Search
-        distances, indices = self.index.search(query_vector, min(top_k, self.index.ntotal))
+        if params is None and len(query_vectors) == 1 and self._use_db_parallel():
+            distances, indices = self._search_db_parallel(query_vectors, k)
+        else:
+            distances, indices = self.index.search(query_vectors, k, params=params)
+        return distances, self._to_similarities(distances), indices
+    
+    def _use_db_parallel(self) -> bool:
+        """Whether a single query should be split over database slabs (see _search_db_parallel)."""
+        return (isinstance(self.index, faiss.IndexFlat)
+                and self.index.ntotal >= self.parallel_search_min
+                and faiss.omp_get_max_threads() > 1)
+    
+    def _search_db_parallel(self, query_vector: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top-k for one query on a flat index, splitting the database across threads.
         
-        # Get results
-        ids = []
-        docs = []
-        metadatas = []
-        result_distances = []
+        FAISS parallelizes a search over its queries, so a single query scans
+        the whole database on one core. faiss.knn releases the GIL, so
+        slabs searched from a thread pool run on all cores; their top-k
+        lists are then merged.
+        """
+        if self._slab_executor is None:
+            self._slab_workers = faiss.omp_get_max_threads()
+            self._slab_executor = ThreadPoolExecutor(
+                max_workers=self._slab_workers, thread_name_prefix="faiss-slab"
+            )
         
-        for i, idx in enumerate(indices[0]):
-            if idx >= 0 and idx < len(self.metadata_store):
-                metadata_entry = self.metadata_store[idx]
-                
-                # Apply metadata filter if provided
-                if filter_metadata:
-                    matches = all(
-                        metadata_entry['metadata'].get(key) == value 
-                        for key, value in filter_metadata.items()
-                    )
-                    if not matches:
-                        continue
-                
-                ids.append(metadata_entry['chunk_id'])
-                docs.append(metadata_entry['content'])
-                metadatas.append(metadata_entry['metadata'])
-                result_distances.append(float(distances[0][i]))
+        ntotal, dim = self.index.ntotal, self.index.d
+        metric = self.index.metric_type
+        # Zero-copy view of the stored vectors, also of a memory-mapped index
+        vectors = faiss.rev_swig_ptr(self.index.get_xb(), ntotal * dim).reshape(ntotal, dim)
+        bounds = np.linspace(0, ntotal, self._slab_workers + 1, dtype='int64')
         
-        return {
-            "ids": ids,
-            "distances": result_distances,
-            "documents": docs,
-"metadatas": metadatas
-        }
+        def search_slab(start: int, end: int) -> Tuple[np.ndarray, np.ndarray]:
+            distances, indices = faiss.knn(query_vector, vectors[start:end], min(k, end - start), metric=metric)
+            return distances, indices + start
+        
+        slabs = list(self._slab_executor.map(search_slab, bounds[:-1], bounds[1:]))
+        distances = np.concatenate([slab[0] for slab in slabs], axis=1)
+        indices = np.concatenate([slab[1] for slab in slabs], axis=1)
+        
+        # Best k of the slabs' candidates, best first
+        ranking = -distances[0] if metric == faiss.METRIC_INNER_PRODUCT else distances[0]
+        top = np.argpartition(ranking, k - 1)[:k] if len(ranking) > k else np.arange(len(ranking))
+        top = top[np.argsort(ranking[top], kind='stable')]
+        return distances[:, top], indices[:, top]
+    
+    @staticmethod
+    def _empty_result() -> Dict:
+        """Search result with no hits."""
+        return {"ids": [], "distances": [], "similarities": [], "documents": [], "metadatas": []}
+    
+    def _to_similarities(self, distances: np.ndarray) -> np.ndarray:
+        """
+        Convert raw index scores to cosine similarity.
+        
+        Inner-product indexes already return cosine similarity for unit
+        vectors. Indexes built before the switch use L2, where FAISS returns
+        squared distances d = 2 - 2*cos for unit vectors.
+        """
+        if self.index.metric_type == faiss.METRIC_INNER_PRODUCT:
+            return distances
+        return 1 - distances / 2
     
     def get_collection_stats(self) -> Dict:
         """Get collection statistics."""
@@ -173,18 +682,21 @@ class FAISSVectorStore:
     def clear_collection(self):
         """Clear all data from collection."""
         self.index = None
-        self.metadata_store = []
+        self._mapped = False
+        self._set_ids([])
+        self.categories = np.array([], dtype=str)
+        self.weeks = np.array([], dtype='int32')
+        self._reset_category_buckets()
         self.dimension = None
+        self._set_clean()
         
         # Remove files
-        index_path = self._get_index_path()
-        metadata_path = self._get_metadata_path()
-        
-        if index_path.exists():
-            index_path.unlink()
-        if metadata_path.exists():
-            metadata_path.unlink()
+        for path in (self._get_index_path(), self._get_ids_path(), self._get_categories_path(),
+                     self._get_weeks_path(), self._get_metadata_path()):
+            if path.exists():
+                path.unlink()
         
+        self._notify_listeners()
         print(f"[INFO] Collection {self.collection_name} cleared")
 
 
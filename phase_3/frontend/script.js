@@ -57,8 +57,8 @@ chatForm.addEventListener('submit', async function (e) {
     const loadingId = addLoadingMessage();
 
     try {
-        // Call API
-        const response = await fetch('http://localhost:5000/api/chat', {
+        // Call streaming API; the answer arrives as Server-Sent Events
+        const response = await fetch('http://localhost:5000/api/chat/stream', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -66,17 +66,46 @@ chatForm.addEventListener('submit', async function (e) {
             body: JSON.stringify({ query })
         });
 
-        if (!response.ok) {
+        if (!response.ok || !response.body) {
             throw new Error('Failed to get response');
         }
 
-        const data = await response.json();
-
-        // Remove loading indicator
-        removeMessage(loadingId);
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let textDiv = null;
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+
+            // Events are separated by a blank line
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+
+            for (const raw of events) {
+                if (!raw.startsWith('data: ')) continue;
+                const event = JSON.parse(raw.slice(6));
+
+                if (event.event === 'token') {
+                    // Replace loading indicator with the answer on the first token
+                    if (!textDiv) {
+                        removeMessage(loadingId);
+                        textDiv = addMessage('', 'bot').querySelector('.message-text');
+                    }
+                    textDiv.textContent += event.content;
+                    chatContainer.scrollTop = chatContainer.scrollHeight;
+                } else if (event.event === 'error') {
+                    throw new Error(event.error);
+                }
+            }
+        }
 
-        // Add bot response
-        addMessage(data.answer, 'bot', data.sources, data.metadata);
+        if (!textDiv) {
+            throw new Error('Empty response');
+        }
 
         updateStatus('Ready', true);
 
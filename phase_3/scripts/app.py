@@ -1,15 +1,22 @@
 """
 Flask API for Nextleap RAG Chatbot.
+
+Running this file starts the Flask development server. In production, serve
+it with gunicorn from this directory:
+    gunicorn -c gunicorn_conf.py app:app
 """
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, Response, request, jsonify, send_from_directory, stream_with_context
 from flask_cors import CORS
+import json
 import os
 import sys
 from pathlib import Path
 from dotenv import load_dotenv
 
 # Add src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+src_path = str(Path(__file__).parent.parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
 
 from api.chatbot import NextleapChatbot
 
@@ -70,6 +77,31 @@ def chat():
         return jsonify({"error": str(e)}), 500
 
 
+@app.route('/api/chat/stream', methods=['POST'])
+def chat_stream():
+    """Handle chat queries, streaming the answer as Server-Sent Events."""
+    data = request.get_json()
+    query = data.get('query', '').strip()
+    
+    if not query:
+        return jsonify({"error": "Query cannot be empty"}), 400
+    
+    def events():
+        try:
+            for event in chatbot.stream_answer(query):
+                yield f"data: {json.dumps(event)}\n\n"
+        except Exception as e:
+            print(f"[ERROR] {e}")
+            yield f"data: {json.dumps({'event': 'error', 'error': str(e)})}\n\n"
+    
+    return Response(
+        stream_with_context(events()),
+        mimetype='text/event-stream',
+        # Keep proxies from buffering the stream
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/health', methods=['GET'])
 def health():
     """Health check endpoint."""
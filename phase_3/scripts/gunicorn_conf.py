@@ -0,0 +1,21 @@
+"""
+Gunicorn configuration for the Nextleap RAG Chatbot API.
+
+Run from phase_3/scripts:
+    gunicorn -c gunicorn_conf.py app:app
+"""
+import os
+
+bind = os.getenv("BIND", "0.0.0.0:5000")
+
+# Import app.py (and load the embedding model, FAISS index and Groq client)
+# once in the master; forked workers share those pages copy-on-write
+preload_app = True
+
+workers = int(os.getenv("WEB_CONCURRENCY", os.cpu_count() or 1))
+# Threads keep a worker serving other requests while one waits on the LLM
+worker_class = "gthread"
+threads = int(os.getenv("GUNICORN_THREADS", 4))
+
+# LLM responses can take several seconds
+timeout = 120
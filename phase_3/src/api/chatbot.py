@@ -4,20 +4,30 @@ Nextleap RAG Chatbot - Main orchestrator for Phase 3.
 import os
 import sys
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+import faiss
 from dotenv import load_dotenv
 
 # Add Phase 3 src to path
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+src_path = str(Path(__file__).parent.parent)
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
 
 from query.query_processor import QueryProcessor
+from retrieval.query_cache import QueryCache
 from retrieval.retriever import ContextRetriever
+from retrieval.search_batcher import SearchBatcher
 from llm.groq_client import GroqLLMClient
 
 
 class NextleapChatbot:
     """Main chatbot orchestrator integrating all Phase 3 components."""
     
+    # Normalized queries whose retrieved chunks and context are kept (least recently used evicted)
+    context_cache_size = 512
+    # Seconds a cached context stays valid
+    context_cache_ttl = 3600.0
+    
     def __init__(self, 
                  vector_db_path: str,
                  metadata_db_path: str,
@@ -37,15 +47,30 @@ class NextleapChatbot:
         # Load environment variables
         load_dotenv()
         
+        # FAISS spreads batched queries (answer_queries) over its OpenMP threads;
+        # servers with concurrent sessions set 1 to avoid oversubscription
+        faiss.omp_set_num_threads(int(os.getenv("FAISS_OMP_THREADS", os.cpu_count() or 1)))
+        
         # Initialize components
         self.query_processor = QueryProcessor()
         
         self.retriever = ContextRetriever(
             vector_db_path=vector_db_path,
             metadata_db_path=metadata_db_path,
-            top_k=int(os.getenv("TOP_K_RESULTS", 5))
+            top_k=int(os.getenv("TOP_K_RESULTS", 5)),
+            nprobe=int(os.getenv("FAISS_NPROBE")) if os.getenv("FAISS_NPROBE") else None,
+            ef_search=int(os.getenv("FAISS_EF_SEARCH")) if os.getenv("FAISS_EF_SEARCH") else None
         )
         
+        # With SEARCH_BATCH_WINDOW_MS set, concurrent requests' searches are
+        # coalesced into batched FAISS calls
+        batch_window_ms = float(os.getenv("SEARCH_BATCH_WINDOW_MS", 0))
+        self._searcher = SearchBatcher(
+            self.retriever,
+            max_batch=int(os.getenv("SEARCH_BATCH_SIZE", 16)),
+            max_wait_ms=batch_window_ms
+        ) if batch_window_ms > 0 else self.retriever
+        
         self.llm_client = GroqLLMClient(
             api_key=groq_api_key or os.getenv("GROQ_API_KEY"),
             model=os.getenv("GROQ_MODEL", "mixtral-8x7b-32768"),
@@ -53,6 +78,16 @@ class NextleapChatbot:
             max_tokens=int(os.getenv("GROQ_MAX_TOKENS", 1024))
         )
         
+        # Normalized query text -> (retrieved chunks, context), exact matches
+        # only (near-duplicates are matched by the retriever's cache); dropped
+        # whenever the index or chunk content changes
+        self._context_cache = QueryCache(
+            max_size=self.context_cache_size,
+            ttl_seconds=self.context_cache_ttl
+        )
+        self.retriever.vector_store.add_listener(self._context_cache.clear)
+        self.retriever.metadata_store.add_listener(self._context_cache.clear)
+        
         print("\n[SUCCESS] Chatbot initialized and ready!")
         print("=" * 70 + "\n")
     
@@ -68,16 +103,66 @@ class NextleapChatbot:
         """
         print(f"\n[QUERY] {user_query}")
         
-        # Step 1: Process query
-        processed = self.query_processor.process_query(user_query)
-        
-        # Step 2: Retrieve context
-        retrieved_chunks = self.retriever.retrieve(processed['embedding'])
-        context = self.retriever.build_context(retrieved_chunks)
+        # Steps 1-2: Process query and retrieve context (cached for repeats)
+        retrieved_chunks, context = self._retrieve_contexts([user_query])[0]
         
         print(f"[INFO] Retrieved {len(retrieved_chunks)} relevant chunks")
         
         # Step 3: Generate response
+        return self._generate_answer(user_query, retrieved_chunks, context)
+    
+    def answer_queries(self, user_queries: List[str]) -> List[dict]:
+        """
+        Answer several user queries, embedding and retrieving them as one batch.
+        
+        Args:
+            user_queries: User questions
+        
+        Returns:
+            One response dict per query, as returned by answer_query()
+        """
+        print(f"\n[QUERY] Batch of {len(user_queries)} queries")
+        
+        # Steps 1-2: Embed and search the uncached queries as one batch
+        contexts = self._retrieve_contexts(user_queries)
+        
+        print(f"[INFO] Retrieved {sum(len(chunks) for chunks, _ in contexts)} relevant chunks")
+        
+        # Step 3: Generate responses
+        return [
+            self._generate_answer(query, chunks, context)
+            for query, (chunks, context) in zip(user_queries, contexts)
+        ]
+    
+    def _retrieve_contexts(self, user_queries: List[str]) -> List[Tuple[List[Dict], str]]:
+        """
+        Retrieve chunks and build the context for each query.
+        
+        A query seen before (after normalization) reuses its cached result
+        without embedding or searching. The rest are embedded and retrieved
+        as one batch, in which the retriever answers near-duplicates of
+        recent queries from its cache.
+        """
+        normalized = [self.query_processor.normalize_query(query) for query in user_queries]
+        
+        found = {}
+        for query in dict.fromkeys(normalized):
+            entry = self._context_cache.get(query)
+            if entry is not None:
+                found[query] = entry
+        
+        missing = [query for query in dict.fromkeys(normalized) if query not in found]
+        if missing:
+            embeddings = self.query_processor.generate_query_embeddings(missing)
+            batch_chunks = self._searcher.retrieve_batch(embeddings)
+            for query, chunks in zip(missing, batch_chunks):
+                found[query] = (chunks, self.retriever.build_context(chunks))
+                self._context_cache.put(query, found[query])
+        
+        return [found[query] for query in normalized]
+    
+    def _generate_answer(self, user_query: str, retrieved_chunks: List[Dict], context: str) -> dict:
+        """Generate the LLM answer for retrieved context and build the response dict."""
         llm_response = self.llm_client.generate_response(
             query=user_query,
             context=context
@@ -87,23 +172,54 @@ class NextleapChatbot:
         response = {
             "query": user_query,
             "answer": llm_response['answer'],
-            "sources": [
-                {
-                    "chunk_id": chunk['chunk_id'],
-                    "category": chunk['metadata']['category'],
-                    "similarity": chunk['similarity']
-                }
-                for chunk in retrieved_chunks
-            ],
+            "sources": self._format_sources(retrieved_chunks),
             "metadata": {
                 "model": llm_response['model'],
                 "tokens_used": llm_response['tokens_used'],
+                "finish_reason": llm_response['finish_reason'],
                 "chunks_retrieved": len(retrieved_chunks)
             }
         }
         
         return response
     
+    def stream_answer(self, user_query: str) -> Iterator[Dict]:
+        """
+        Answer user query using RAG pipeline, streaming the LLM output.
+        
+        Args:
+            user_query: User's question
+        
+        Yields:
+            {"event": "sources", "sources": [...]} once retrieval is done,
+            then the LLM client's "token" events and a final "done" event
+            (with "chunks_retrieved" added) or an "error" event
+        """
+        print(f"\n[QUERY] {user_query}")
+        
+        retrieved_chunks, context = self._retrieve_contexts([user_query])[0]
+        
+        print(f"[INFO] Retrieved {len(retrieved_chunks)} relevant chunks")
+        
+        yield {"event": "sources", "sources": self._format_sources(retrieved_chunks)}
+        
+        for event in self.llm_client.stream_response(query=user_query, context=context):
+            if event['event'] == 'done':
+                event['chunks_retrieved'] = len(retrieved_chunks)
+            yield event
+    
+    @staticmethod
+    def _format_sources(retrieved_chunks: List[Dict]) -> List[Dict]:
+        """Summarize retrieved chunks as response sources."""
+        return [
+            {
+                "chunk_id": chunk['chunk_id'],
+                "category": chunk['metadata']['category'],
+                "similarity": chunk['similarity']
+            }
+            for chunk in retrieved_chunks
+        ]
+    
     def close(self):
         """Close database connections."""
         self.retriever.close()
@@ -133,13 +249,14 @@ def main():
     print(" TESTING CHATBOT WITH SAMPLE QUERIES")
     print("=" * 70 + "\n")
     
-    for i, query in enumerate(test_queries, 1):
+    # Embed and search all sample queries as one batch
+    responses = chatbot.answer_queries(test_queries)
+    
+    for i, response in enumerate(responses, 1):
         print(f"\n{'='*70}")
-        print(f"Query {i}/{len(test_queries)}")
+        print(f"Query {i}/{len(test_queries)}: {response['query']}")
         print('='*70)
         
-        response = chatbot.answer_query(query)
-        
         print(f"\n[ANSWER]")
         print(response['answer'])
         
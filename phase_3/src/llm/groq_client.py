@@ -3,7 +3,7 @@ Groq LLM client for Phase 3: Generate responses using Groq API.
 """
 import os
 from groq import Groq
-from typing import Optional
+from typing import Dict, Iterator, List, Optional
 
 
 class GroqLLMClient:
@@ -56,21 +56,10 @@ Guidelines:
         Returns:
             Response dict with answer and metadata
         """
-        # Build user prompt
-        user_prompt = f"""Context:
-{context}
-
-Student Question: {query}
-
-Answer:"""
-        
         try:
             # Call Groq API
             chat_completion = self.client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": self.SYSTEM_PROMPT},
-                    {"role": "user", "content": user_prompt}
-                ],
+                messages=self._build_messages(query, context),
                 model=self.model,
                 temperature=self.temperature,
                 max_tokens=self.max_tokens
@@ -94,6 +83,66 @@ Answer:"""
                 "tokens_used": 0,
                 "finish_reason": "error"
             }
+    
+    def stream_response(self, query: str, context: str) -> Iterator[Dict]:
+        """
+        Generate a response using Groq LLM, yielding it as it is produced.
+        
+        Args:
+            query: User query
+            context: Retrieved context
+        
+        Yields:
+            {"event": "token", "content": ...} for each piece of the answer,
+            then {"event": "done", ...} with the same metadata as
+            generate_response, or {"event": "error", "error": ...}
+        """
+        try:
+            stream = self.client.chat.completions.create(
+                messages=self._build_messages(query, context),
+                model=self.model,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                stream=True
+            )
+            
+            tokens_used = 0
+            finish_reason = None
+            for chunk in stream:
+                if chunk.choices:
+                    choice = chunk.choices[0]
+                    if choice.delta.content:
+                        yield {"event": "token", "content": choice.delta.content}
+                    finish_reason = choice.finish_reason or finish_reason
+                # Groq reports usage on the final chunk
+                if chunk.x_groq and chunk.x_groq.usage:
+                    tokens_used = chunk.x_groq.usage.total_tokens
+            
+            yield {
+                "event": "done",
+                "model": self.model,
+                "tokens_used": tokens_used,
+                "finish_reason": finish_reason
+            }
+        
+        except Exception as e:
+            print(f"[ERROR] Groq API call failed: {e}")
+            yield {"event": "error", "error": f"Error: Unable to generate response. {str(e)}"}
+    
+    def _build_messages(self, query: str, context: str) -> List[Dict]:
+        """Build the chat messages for a query and its retrieved context."""
+        # Build user prompt
+        user_prompt = f"""Context:
+{context}
+
+Student Question: {query}
+
+Answer:"""
+        
+        return [
+            {"role": "system", "content": self.SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ]
 
 
 if __name__ == "__main__":
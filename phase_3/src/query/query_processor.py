@@ -2,21 +2,72 @@
 Query processor for Phase 3: Process user queries and generate embeddings.
 """
 from sentence_transformers import SentenceTransformer
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+import os
 import re
+import threading
+
+# Whitespace runs, collapsed to one space by normalize_query
+_WS_RE = re.compile(r'\s+')
+
+# Loaded models shared by every QueryProcessor in the process, keyed by
+# (model_name, use_onnx); under gunicorn --preload forked workers share them too
+_MODEL_CACHE: Dict[Tuple[str, bool], SentenceTransformer] = {}
+
+
+def _load_model(model_name: str, use_onnx: bool) -> SentenceTransformer:
+    """
+    Load the query embedding model, on ONNX Runtime if requested.
+    
+    ONNX_MODEL_FILE picks a specific export from the model repo, e.g.
+    "onnx/model_qint8_avx512_vnni.onnx" for the int8-quantized encoder.
+    Falls back to PyTorch if ONNX Runtime is unavailable.
+    """
+    if use_onnx:
+        file_name = os.getenv("ONNX_MODEL_FILE")
+        try:
+            # Needs sentence-transformers >= 3.2 with the onnx extra
+            return SentenceTransformer(
+                model_name,
+                backend="onnx",
+                model_kwargs={"file_name": file_name} if file_name else None
+            )
+        except Exception as e:
+            print(f"[INFO] ONNX backend unavailable ({e}), using PyTorch")
+    return SentenceTransformer(model_name)
 
 
 class QueryProcessor:
     """Process and prepare user queries for retrieval."""
     
-    def __init__(self, model_name: str = "all-MiniLM-L6-v2"):
+    # Number of normalized queries whose embeddings are kept (least recently used evicted)
+    cache_size = 1024
+    # Encoding batch size for generate_query_embeddings
+    batch_size = 32
+    
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", use_onnx: Optional[bool] = None):
         """
         Initialize query processor.
         
         Args:
             model_name: Embedding model name (same as Phase 2)
+            use_onnx: Run the model on ONNX Runtime; read from the USE_ONNX
+                environment variable if None
         """
-        print(f"[INFO] Loading query embedding model: {model_name}")
-        self.model = SentenceTransformer(model_name)
+        if use_onnx is None:
+            use_onnx = os.getenv("USE_ONNX", "").lower() in ("1", "true", "yes")
+        
+        key = (model_name, use_onnx)
+        if key not in _MODEL_CACHE:
+            print(f"[INFO] Loading query embedding model: {model_name}")
+            _MODEL_CACHE[key] = _load_model(model_name, use_onnx)
+        self.model = _MODEL_CACHE[key]
+        # Normalized query -> embedding, most recently used last
+        self._embedding_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        # Guards the cache when request threads share one processor
+        self._cache_lock = threading.Lock()
         print(f"[OK] Query processor initialized")
     
     def normalize_query(self, query: str) -> str:
@@ -30,11 +81,15 @@ class QueryProcessor:
             Normalized query string
         """
         # Remove extra whitespace
-        query = re.sub(r'\s+', ' ', query).strip()
+        query = query.strip()
         
-        return query
+        # Printable ASCII without double spaces has nothing to collapse
+        if query.isascii() and query.isprintable() and '  ' not in query:
+            return query
+        
+        return _WS_RE.sub(' ', query)
     
-    def generate_query_embedding(self, query: str) -> list:
+    def generate_query_embedding(self, query: str) -> np.ndarray:
         """
         Generate embedding for query.
         
@@ -42,10 +97,50 @@ class QueryProcessor:
             query: Query text
         
         Returns:
-            Query embedding as list
+            Query embedding as a float32 array, passed to the vector store as-is
         """
-        embedding = self.model.encode([query], normalize_embeddings=True)[0]
-        return embedding.tolist()
+        return self.generate_query_embeddings([query])[0]
+    
+    def generate_query_embeddings(self, queries: List[str]) -> np.ndarray:
+        """
+        Generate embeddings for several queries in batched encode calls.
+        
+        Embeddings of recently seen queries come from the cache; only the
+        rest are encoded.
+        
+        Args:
+            queries: Query texts
+        
+        Returns:
+            float32 array of shape [len(queries), embedding_dim]
+        """
+        found = {}
+        with self._cache_lock:
+            for query in queries:
+                if query in self._embedding_cache:
+                    self._embedding_cache.move_to_end(query)
+                    found[query] = self._embedding_cache[query]
+        
+        missing = [query for query in dict.fromkeys(queries) if query not in found]
+        if missing:
+            encoded = self.model.encode(
+                missing,
+                batch_size=self.batch_size,
+                normalize_embeddings=True,
+                convert_to_numpy=True
+            )
+            with self._cache_lock:
+                for query, embedding in zip(missing, encoded):
+                    found[query] = embedding
+                    self._cache_embedding(query, embedding)
+        
+        return np.array([found[query] for query in queries], dtype=np.float32)
+    
+    def _cache_embedding(self, query: str, embedding: np.ndarray):
+        """Store a query embedding, evicting the least recently used beyond cache_size."""
+        self._embedding_cache[query] = embedding
+        if len(self._embedding_cache) > self.cache_size:
+            self._embedding_cache.popitem(last=False)
     
     def process_query(self, query: str) -> dict:
         """
@@ -55,16 +150,31 @@ class QueryProcessor:
             query: Raw user query
         
         Returns:
-            Processed query dict with normalized text and embedding
+            Processed query dict with normalized text and embedding (float32 array)
+        """
+        return self.process_queries([query])[0]
+    
+    def process_queries(self, queries: List[str]) -> List[dict]:
         """
-        normalized = self.normalize_query(query)
-        embedding = self.generate_query_embedding(normalized)
-        
-        return {
-            "original_query": query,
-            "normalized_query": normalized,
-            "embedding": embedding
-        }
+        Process several queries, encoding the uncached ones in one batch.
+        
+        Args:
+            queries: Raw user queries
+        
+        Returns:
+            List of processed query dicts, as from process_query
+        """
+        normalized = [self.normalize_query(query) for query in queries]
+        embeddings = self.generate_query_embeddings(normalized)
+        
+        return [
+            {
+                "original_query": query,
+                "normalized_query": norm,
+                "embedding": embedding
+            }
+            for query, norm, embedding in zip(queries, normalized, embeddings)
+        ]
 
 
 if __name__ == "__main__":
@@ -76,4 +186,4 @@ if __name__ == "__main__":
     
     print(f"\nOriginal: {result['original_query']}")
     print(f"Normalized: {result['normalized_query']}")
-    print(f"Embedding shape: {len(result['embedding'])}")
+    print(f"Embedding shape: {result['embedding'].shape}")
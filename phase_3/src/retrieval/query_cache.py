@@ -0,0 +1,156 @@
+"""
+Query cache for Phase 3: LRU + TTL cache of retrieval results, with near-duplicate matching.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+
+
+class QueryCache:
+    """
+    Thread-safe LRU cache whose entries expire after ttl_seconds.
+    
+    Entries stored with a query embedding can also be found by a different
+    key: get() falls back to the cached embedding most similar to the one
+    given, if it is at least similarity_threshold (cosine similarity) and was
+    stored under the same scope.
+    """
+    
+    def __init__(self, max_size: int = 1024, ttl_seconds: Optional[float] = 3600.0,
+                 similarity_threshold: Optional[float] = None):
+        """
+        Initialize query cache.
+        
+        Args:
+            max_size: Number of entries kept (least recently used evicted);
+                0 disables the cache
+            ttl_seconds: Seconds an entry stays valid (None to never expire)
+            similarity_threshold: Cosine similarity for a near-duplicate match
+                (None to match exact keys only)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.RLock()
+        self.clear()
+    
+    @staticmethod
+    def embedding_key(embedding: np.ndarray, *parts: Optional[str]) -> str:
+        """Exact-match key for a query embedding plus e.g. its category filter."""
+        digest = hashlib.blake2b(
+            np.ascontiguousarray(embedding, dtype=np.float32).tobytes(), digest_size=16
+        ).hexdigest()
+        return "|".join([digest, *(part or "" for part in parts)])
+    
+    def get(self, key: Hashable, embedding: Optional[np.ndarray] = None,
+            scope: Hashable = None) -> Optional[Any]:
+        """
+        Look up a cached value.
+        
+        Args:
+            key: Exact-match key
+            embedding: Query embedding for a near-duplicate match if key is not cached
+            scope: Only entries stored with the same scope match by embedding
+        
+        Returns:
+            Cached value, or None on a miss
+        """
+        if self.max_size <= 0:
+            return None
+        
+        with self._lock:
+            if key not in self._entries and embedding is not None:
+                key = self._nearest(embedding, scope)
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def put(self, key: Hashable, value: Any, embedding: Optional[np.ndarray] = None,
+            scope: Hashable = None):
+        """
+        Cache a value, evicting the least recently used entry beyond max_size.
+        
+        Args:
+            key: Exact-match key
+            value: Value to cache
+            embedding: Query embedding, to also match near-duplicate queries
+            scope: Scope the embedding matches within (e.g. a category filter)
+        """
+        if self.max_size <= 0:
+            return
+        
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_size:
+                self._remove(next(iter(self._entries)))
+            
+            slot = None
+            if embedding is not None and self.similarity_threshold is not None:
+                slot = self._store_embedding(key, embedding, scope)
+            
+            expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+            self._entries[key] = (value, expires_at, slot)
+    
+    def clear(self):
+        """Drop every entry, e.g. after the indexed corpus changed."""
+        size = max(self.max_size, 0)
+        with self._lock:
+            # key -> (value, expiry time, embedding slot or None), most recently used last
+            self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], Optional[int]]]" = OrderedDict()
+            # Unit-normalized embeddings by slot, allocated on first use
+            self._vectors: Optional[np.ndarray] = None
+            # Scope id of each slot (-1 when free) and the key stored there
+            self._slot_scopes = np.full(size, -1, dtype=np.int32)
+            self._slot_keys: List[Optional[Hashable]] = [None] * size
+            self._free_slots = list(range(size - 1, -1, -1))
+            self._scope_ids: Dict[Hashable, int] = {}
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def _store_embedding(self, key: Hashable, embedding: np.ndarray, scope: Hashable) -> int:
+        """Put an entry's embedding in a free slot and return the slot."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_size, vector.shape[-1]), dtype=np.float32)
+        
+        slot = self._free_slots.pop()
+        self._vectors[slot] = vector / (np.linalg.norm(vector) or 1.0)
+        self._slot_scopes[slot] = self._scope_ids.setdefault(scope, len(self._scope_ids))
+        self._slot_keys[slot] = key
+        return slot
+    
+    def _nearest(self, embedding: np.ndarray, scope: Hashable) -> Optional[Hashable]:
+        """Key of the most similar cached embedding in scope, if within the threshold."""
+        scope_id = self._scope_ids.get(scope)
+        if self._vectors is None or scope_id is None or self.similarity_threshold is None:
+            return None
+        
+        vector = np.asarray(embedding, dtype=np.float32)
+        # One matrix-vector product scores every slot; free and other-scope slots are masked out
+        scores = self._vectors @ (vector / (np.linalg.norm(vector) or 1.0))
+        scores[self._slot_scopes != scope_id] = -np.inf
+        best = int(np.argmax(scores))
+        if scores[best] >= self.similarity_threshold:
+            return self._slot_keys[best]
+        return None
+    
+    def _remove(self, key: Hashable):
+        """Remove an entry and free its embedding slot."""
+        _, _, slot = self._entries.pop(key)
+        if slot is not None:
+            self._slot_scopes[slot] = -1
+            self._slot_keys[slot] = None
+            self._free_slots.append(slot)
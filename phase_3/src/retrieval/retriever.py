@@ -1,16 +1,50 @@
 """
 Context retriever for Phase 3: Retrieve relevant context from Phase 2 vector DB.
 """
+import asyncio
+import json
 import sys
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Union
+import numpy as np
 
-# Add Phase 2 to path to import vector store
+# Add Phase 2 to path to import vector store, and Phase 3 src for running
+# this file directly; each only once, however often this module is imported
 phase2_path = Path(__file__).parent.parent.parent.parent / 'phase_2' / 'src'
-sys.path.insert(0, str(phase2_path))
+for src_path in (str(phase2_path), str(Path(__file__).parent.parent)):
+    if src_path not in sys.path:
+        sys.path.insert(0, src_path)
 
 from vector_db.chroma_client import FAISSVectorStore
 from metadata_store.sqlite_store import MetadataStore
+from retrieval.query_cache import QueryCache
+
+# Source label for a chunk's context entry, by metadata category
+_FORMATTERS = {
+    "curriculum": lambda m: f"Week {m.get('week', '?')}: {m.get('title', 'Course Content')}",
+    "instructors": lambda m: f"Instructor: {m.get('instructor_name', 'Faculty')}",
+    "tools": lambda m: f"Tools: {m.get('tool_category', 'Technology')}",
+}
+
+
+def _format_category(metadata: Dict) -> str:
+    """Source label for categories without an entry in _FORMATTERS."""
+    return metadata['category'].title()
+
+
+# Fixed text around the chunks in build_context
+_HEADER = "Context Information:\n---\n"
+_FOOTER = "\n---"
+
+
+def _fmt_chunk(chunk: Dict) -> str:
+    """One chunk's context entry: source label, content and relevance line."""
+    metadata = chunk['metadata']
+    return (
+        f"\n[{_FORMATTERS.get(metadata['category'], _format_category)(metadata)}]\n"
+        f"{chunk['content']}\n"
+        f"(Source: {metadata['source']}, Relevance: {chunk['similarity']:.2f})\n"
+    )
 
 
 class ContextRetriever:
@@ -20,7 +54,12 @@ class ContextRetriever:
                  vector_db_path: str,
                  metadata_db_path: str,
                  collection_name: str = "nextleap_course_v1",
-                 top_k: int = 5):
+                 top_k: int = 5,
+                 cache_size: int = 1024,
+                 cache_ttl_seconds: Optional[float] = 3600.0,
+                 cache_similarity: Optional[float] = 0.97,
+                 nprobe: Optional[int] = None,
+                 ef_search: Optional[int] = None):
         """
         Initialize context retriever.
         
@@ -29,59 +68,202 @@ class ContextRetriever:
             metadata_db_path: Path to SQLite metadata database
             collection_name: Collection name
             top_k: Number of results to retrieve
+            cache_size: Number of query results cached (0 disables the cache)
+            cache_ttl_seconds: Seconds a cached result stays valid (None for no expiry)
+            cache_similarity: Cosine similarity at which a near-duplicate query
+                reuses a cached result (None for exact repeats only)
+            nprobe: IVF cells probed per query if the index is IVF/PQ
+                (default: the vector store's)
+            ef_search: HNSW search beam width if the index is HNSW
+                (default: the vector store's)
         """
         print(f"[INFO] Initializing context retriever...")
         
-        # Load vector store
+        # Load metadata store
+        self.metadata_store = MetadataStore(db_path=metadata_db_path)
+        
+        # Load vector store, memory-mapped so server processes share its
+        # pages; search results are resolved through the metadata store
         self.vector_store = FAISSVectorStore(
             persist_directory=vector_db_path,
-            collection_name=collection_name
+            collection_name=collection_name,
+            mmap=True,
+            metadata_db=self.metadata_store,
+            nprobe=nprobe,
+            ef_search=ef_search
         )
         
-        # Load metadata store
-        self.metadata_store = MetadataStore(db_path=metadata_db_path)
-        
         self.top_k = top_k
         
+        # Results of recent queries, dropped whenever the index or the
+        # chunk content changes
+        self._cache = QueryCache(
+            max_size=cache_size,
+            ttl_seconds=cache_ttl_seconds,
+            similarity_threshold=cache_similarity
+        ) if cache_size > 0 else None
+        if self._cache is not None:
+            self.vector_store.add_listener(self._cache.clear)
+            self.metadata_store.add_listener(self._cache.clear)
+        
         print(f"[OK] Context retriever initialized (top_k={top_k})")
     
-    def retrieve(self, query_embedding: List[float], 
+    def retrieve(self, query_embedding: Union[np.ndarray, List[float]], 
                  category_filter: Optional[str] = None) -> List[Dict]:
         """
         Retrieve relevant chunks for query.
         
         Args:
-            query_embedding: Query embedding vector
+            query_embedding: Query embedding vector (float32 ndarray, or list of floats)
             category_filter: Optional category filter (e.g., "curriculum")
         
         Returns:
-            List of relevant chunks with content and metadata
+            List of relevant chunks with content and metadata; a repeated or
+            near-duplicate query gets the cached list, which must not be modified
+        """
+        query_vector = np.ascontiguousarray(query_embedding, dtype='float32').reshape(1, -1)
+        return self.retrieve_batch(query_vector, category_filter)[0]
+    
+    def retrieve_batch(self, query_embeddings: Union[np.ndarray, List[List[float]]],
+                       category_filters: Union[str, Sequence[Optional[str]], None] = None) -> List[List[Dict]]:
         """
-        # Search vector database
-        filter_metadata = {"category": category_filter} if category_filter else None
+        Retrieve relevant chunks for several queries with one vector search.
         
-        results = self.vector_store.search(
-            query_embedding=query_embedding,
-            top_k=self.top_k,
-            filter_metadata=filter_metadata
-        )
+        Queries with a cached result are answered from the cache; only the
+        rest are searched, as one sub-batch.
+        
+        Args:
+            query_embeddings: Query embeddings of shape [num_queries, dim]
+            category_filters: Optional category filter applied to every query,
+                or a list with one category (or None) per query
+        
+        Returns:
+            One list of relevant chunks per query, as returned by retrieve()
+        """
+        # Stack into one contiguous float32 [num_queries, dim] matrix
+        query_vectors = np.ascontiguousarray(query_embeddings, dtype='float32')
+        filters = self._per_query_filters(category_filters, len(query_vectors))
+        
+        results = self.cached_results(query_vectors, filters)
+        misses = [i for i, chunks in enumerate(results) if chunks is None]
+        if misses:
+            miss_vectors = query_vectors if len(misses) == len(results) else query_vectors[misses]
+            miss_filters = [filters[i] for i in misses]
+            
+            # Search vector database
+            hits = self.vector_store.search_ids_batch(
+                miss_vectors,
+                top_k=self.top_k,
+                filter_metadata=self._filter_metadata(miss_filters)
+            )
+            
+            # Fetch content and metadata for just the hits, in one lookup
+            wanted = list({chunk_id for hit in hits for chunk_id in hit["ids"]})
+            rows = self.metadata_store.get_many(wanted) if wanted else {}
+            
+            # Format results
+            self._fill_misses(results, misses, miss_vectors, miss_filters, hits, rows)
+        
+        return results
+    
+    async def aretrieve_batch(self, query_embeddings: Union[np.ndarray, List[List[float]]],
+                              category_filters: Union[str, Sequence[Optional[str]], None] = None) -> List[List[Dict]]:
+        """
+        retrieve_batch for asyncio callers.
+        
+        The vector search and the metadata fetch each run on a worker thread
+        (FAISS and sqlite3 release the GIL), so the caller can gather this
+        with its own work, e.g. preparing the LLM request.
+        
+        Args:
+            query_embeddings: Query embeddings of shape [num_queries, dim]
+            category_filters: As for retrieve_batch()
+        
+        Returns:
+            One list of relevant chunks per query, as returned by retrieve()
+        """
+        query_vectors = np.ascontiguousarray(query_embeddings, dtype='float32')
+        filters = self._per_query_filters(category_filters, len(query_vectors))
+        
+        results = self.cached_results(query_vectors, filters)
+        misses = [i for i, chunks in enumerate(results) if chunks is None]
+        if misses:
+            miss_vectors = query_vectors if len(misses) == len(results) else query_vectors[misses]
+            miss_filters = [filters[i] for i in misses]
+            
+            hits = await asyncio.to_thread(
+                self.vector_store.search_ids_batch,
+                miss_vectors,
+                top_k=self.top_k,
+                filter_metadata=self._filter_metadata(miss_filters)
+            )
+            
+            wanted = list({chunk_id for hit in hits for chunk_id in hit["ids"]})
+            rows = await self.metadata_store.aget_many(wanted)
+            
+            self._fill_misses(results, misses, miss_vectors, miss_filters, hits, rows)
+        
+        return results
+    
+    def cached_results(self, query_vectors: np.ndarray,
+                       category_filters: Sequence[Optional[str]]) -> List[Optional[List[Dict]]]:
+        """
+        Look up queries in the result cache, without searching.
+        
+        Args:
+            query_vectors: float32 query embeddings of shape [num_queries, dim]
+            category_filters: One category (or None) per query
         
-        # Format results
+        Returns:
+            Each query's cached chunks (a repeat or near-duplicate query's
+            result), or None where it must be searched
+        """
+        if self._cache is None:
+            return [None] * len(query_vectors)
+        return [
+            self._cache.get(QueryCache.embedding_key(vector, category), vector, scope=category)
+            for vector, category in zip(query_vectors, category_filters)
+        ]
+    
+    def _fill_misses(self, results: List[Optional[List[Dict]]], misses: List[int],
+                     miss_vectors: np.ndarray, miss_filters: List[Optional[str]],
+                     hits: List[Dict], rows: Dict[str, Dict]):
+        """Format the searched queries' hits into results, caching each result."""
+        for i, vector, category, hit in zip(misses, miss_vectors, miss_filters, hits):
+            results[i] = self._format_hits(hit, rows)
+            if self._cache is not None:
+                self._cache.put(QueryCache.embedding_key(vector, category), results[i],
+                                vector, scope=category)
+    
+    @staticmethod
+    def _per_query_filters(category_filters: Union[str, Sequence[Optional[str]], None],
+                           num_queries: int) -> List[Optional[str]]:
+        """One category (or None) per query, from a shared or per-query filter."""
+        if category_filters is None or isinstance(category_filters, str):
+            return [category_filters] * num_queries
+        return list(category_filters)
+    
+    @staticmethod
+    def _filter_metadata(category_filters: Sequence[Optional[str]]) -> List[Optional[Dict]]:
+        """Vector store filter of each query, from its category."""
+        return [{"category": category} if category else None for category in category_filters]
+    
+    @staticmethod
+    def _format_hits(hit: Dict, rows: Dict[str, Dict]) -> List[Dict]:
+        """Build the retrieved chunks of one query from its hits and their fetched rows."""
         retrieved_chunks = []
-        for i, (chunk_id, distance, doc, metadata) in enumerate(zip(
-            results['ids'],
-            results['distances'],
-            results['documents'],
-            results['metadatas']
-        )):
-            similarity = 1 - distance  # Convert L2 distance to similarity
+        for chunk_id, similarity in zip(hit["ids"], hit["similarities"]):
+            row = rows.get(chunk_id)
+            if row is None:
+                # Chunk removed from the metadata store since it was indexed
+                continue
             
             retrieved_chunks.append({
                 "chunk_id": chunk_id,
-                "content": doc,
-                "metadata": metadata,
-                "similarity": float(similarity),
-                "rank": i + 1
+                "content": row['content'],
+                "metadata": json.loads(row['metadata']),
+                "similarity": similarity,
+                "rank": len(retrieved_chunks) + 1
             })
         
         return retrieved_chunks
@@ -97,28 +279,11 @@ class ContextRetriever:
         Returns:
             Formatted context string for LLM
         """
-        context_parts = ["Context Information:", "---"]
+        context_parts = [_HEADER]
+        context_parts.extend(_fmt_chunk(chunk) for chunk in retrieved_chunks[:max_chunks])
+        context_parts.append(_FOOTER)
         
-        for chunk in retrieved_chunks[:max_chunks]:
-            metadata = chunk['metadata']
-            
-            # Format source info
-            if metadata['category'] == 'curriculum':
-                source = f"Week {metadata.get('week', '?')}: {metadata.get('title', 'Course Content')}"
-            elif metadata['category'] == 'instructors':
-                source = f"Instructor: {metadata.get('instructor_name', 'Faculty')}"
-            elif metadata['category'] == 'tools':
-                source = f"Tools: {metadata.get('tool_category', 'Technology')}"
-            else:
-                source = f"{metadata['category'].title()}"
-            
-            context_parts.append(f"\n[{source}]")
-            context_parts.append(chunk['content'])
-            context_parts.append(f"(Source: {metadata['source']}, Relevance: {chunk['similarity']:.2f})")
-        
-        context_parts.append("\n---")
-        
-        return "\n".join(context_parts)
+        return "".join(context_parts)
     
     def close(self):
         """Close database connections."""
@@ -127,15 +292,13 @@ class ContextRetriever:
 
 if __name__ == "__main__":
     # Test retriever
-    import numpy as np
-    
     retriever = ContextRetriever(
         vector_db_path="../../phase_2/database/vector_db",
         metadata_db_path="../../phase_2/database/metadata.db"
     )
     
     # Test with random embedding
-    test_embedding = np.random.randn(384).tolist()
+    test_embedding = np.random.randn(384).astype(np.float32)
     chunks = retriever.retrieve(test_embedding)
     
     print(f"\nRetrieved {len(chunks)} chunks")
@@ -0,0 +1,122 @@
+"""
+Search batcher for Phase 3: Coalesce concurrent retrievals into one batched vector search.
+"""
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
+
+
+class SearchBatcher:
+    """
+    Run retrieve_batch calls from many threads as a few batched searches.
+    
+    Callers (e.g. concurrent Streamlit sessions) enqueue their queries; one
+    consumer thread collects whatever arrives within max_wait_ms, up to
+    max_batch queries, and searches it with a single retrieve_batch call.
+    With FAISS on one OpenMP thread per search, this keeps throughput up
+    without oversubscribing the cores.
+    
+    The consumer thread is started by the first retrieve_batch in each
+    process. Threads do not survive fork(), so a batcher built before
+    forking (e.g. in gunicorn's preload_app master) starts its own consumer
+    in every worker.
+    """
+    
+    def __init__(self, retriever, max_batch: int = 16, max_wait_ms: float = 10.0):
+        """
+        Initialize search batcher.
+        
+        Args:
+            retriever: ContextRetriever whose retrieve_batch does the searches
+            max_batch: Queries per batched search
+            max_wait_ms: How long the first queued query waits for others
+        """
+        self.retriever = retriever
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self._queue: Optional["queue.Queue"] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+    
+    def _consumer_queue(self) -> "queue.Queue":
+        """This process's queue, starting its consumer thread on first use."""
+        pid = os.getpid()
+        if self._pid != pid:
+            with self._start_lock:
+                if self._pid != pid:
+                    # A queue inherited through fork() has no consumer (and its
+                    # lock may have been held mid-put), so start from a new one
+                    self._queue = queue.Queue()
+                    threading.Thread(target=self._run, args=(self._queue,),
+                                     name="search-batcher", daemon=True).start()
+                    self._pid = pid
+        return self._queue
+    
+    def retrieve_batch(self, query_embeddings: np.ndarray,
+                       category_filters: Union[str, Sequence[Optional[str]], None] = None) -> List[List[Dict]]:
+        """
+        Retrieve relevant chunks, as ContextRetriever.retrieve_batch does,
+        searching together with other threads' concurrent queries.
+        
+        Queries with a cached result are answered on the calling thread; only
+        the rest are queued for the batched search.
+        """
+        query_vectors = np.ascontiguousarray(query_embeddings, dtype='float32')
+        if category_filters is None or isinstance(category_filters, str):
+            category_filters = [category_filters] * len(query_vectors)
+        category_filters = list(category_filters)
+        
+        results = self.retriever.cached_results(query_vectors, category_filters)
+        misses = [i for i, chunks in enumerate(results) if chunks is None]
+        if misses:
+            future: Future = Future()
+            self._consumer_queue().put((
+                query_vectors if len(misses) == len(results) else query_vectors[misses],
+                [category_filters[i] for i in misses],
+                future
+            ))
+            for i, chunks in zip(misses, future.result()):
+                results[i] = chunks
+        
+        return results
+    
+    def _run(self, work: "queue.Queue"):
+        """Consumer loop: gather a batch, search it, hand each caller its rows."""
+        while True:
+            batch = [work.get()]
+            num_queries = len(batch[0][0])
+            deadline = time.monotonic() + self.max_wait
+            
+            while num_queries < self.max_batch:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = work.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                batch.append(item)
+                num_queries += len(item[0])
+            
+            self._search(batch)
+    
+    def _search(self, batch: List):
+        """Search a gathered batch and fulfil its callers' futures."""
+        try:
+            results = self.retriever.retrieve_batch(
+                np.concatenate([vectors for vectors, _, _ in batch]),
+                [category for _, filters, _ in batch for category in filters]
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+        
+        offset = 0
+        for vectors, _, future in batch:
+            future.set_result(results[offset:offset + len(vectors)])
+            offset += len(vectors)
@@ -2,20 +2,52 @@
 Nextleap RAG Chatbot - Streamlit App
 A conversational AI assistant for the Nextleap Product Management Fellowship.
 """
+import os
+
+# Sessions search concurrently: one OpenMP/MKL thread per search, before
+# faiss or numpy is imported, with concurrent searches batched instead
+os.environ.setdefault("OMP_NUM_THREADS", "1")
+os.environ.setdefault("MKL_NUM_THREADS", "1")
+os.environ.setdefault("FAISS_OMP_THREADS", "1")
+os.environ.setdefault("SEARCH_BATCH_WINDOW_MS", "10")
+
 import streamlit as st
+import pickle
 import sys
+import threading
 from pathlib import Path
 from dotenv import load_dotenv
-import os
 
 # Load environment variables
 load_dotenv()
 
-# Add src to path
-sys.path.insert(0, str(Path(__file__).parent / 'src'))
+# Add src to path, once: Streamlit reruns this script on every interaction
+src_path = str(Path(__file__).parent / 'src')
+if src_path not in sys.path:
+    sys.path.insert(0, src_path)
 
 from api.chatbot import NextleapChatbot
 
+# Paths to Phase 2 databases
+VECTOR_DB_PATH = Path(__file__).parent.parent / 'phase_2' / 'database' / 'vector_db'
+METADATA_DB_PATH = Path(__file__).parent.parent / 'phase_2' / 'database' / 'metadata.db'
+INDEX_PATH = VECTOR_DB_PATH / 'nextleap_course_v1.index'
+
+# Sidebar quick questions (button label, query), asked alike by every user
+QUICK_QUESTIONS = [
+    ("📖 What topics are covered?", "What topics are covered in the curriculum?"),
+    ("👨‍🏫 Who are the instructors?", "Who are the instructors?"),
+    ("📅 What is the class schedule?", "What is the class schedule?"),
+    ("💰 How much does it cost?", "How much does the course cost?"),
+]
+
+# Quick-question answers, kept across restarts until the index or the
+# chunk content changes (writes may sit in the -wal file until a checkpoint)
+CANNED_PATH = Path(__file__).parent / '.cache' / 'canned.pkl'
+CORPUS_PATHS = (INDEX_PATH, METADATA_DB_PATH, METADATA_DB_PATH.with_name(METADATA_DB_PATH.name + '-wal'))
+# Serializes read-merge-write of CANNED_PATH between sessions
+_canned_lock = threading.Lock()
+
 # Page configuration
 st.set_page_config(
     page_title="Nextleap PM Fellowship Assistant",
@@ -57,14 +89,72 @@ st.markdown("""
 @st.cache_resource
 def initialize_chatbot():
     """Initialize the chatbot (cached to avoid reloading)."""
-    vector_db_path = Path(__file__).parent.parent / 'phase_2' / 'database' / 'vector_db'
-    metadata_db_path = Path(__file__).parent.parent / 'phase_2' / 'database' / 'metadata.db'
-    
     return NextleapChatbot(
-        vector_db_path=str(vector_db_path),
-        metadata_db_path=str(metadata_db_path)
+        vector_db_path=str(VECTOR_DB_PATH),
+        metadata_db_path=str(METADATA_DB_PATH)
     )
 
+def corpus_version() -> tuple:
+    """Modification times of the index and metadata database files (None if absent)."""
+    return tuple(path.stat().st_mtime_ns if path.exists() else None for path in CORPUS_PATHS)
+
+def _load_canned(version: tuple) -> dict:
+    """Quick-question answers saved for this corpus version, or {} if none."""
+    try:
+        with open(CANNED_PATH, 'rb') as f:
+            saved = pickle.load(f)
+        if isinstance(saved, dict) and saved.get('version') == version:
+            return saved['answers']
+    except (OSError, EOFError, KeyError, pickle.UnpicklingError):
+        pass
+    return {}
+
+def _save_canned(version: tuple, query: str, response: dict):
+    """Add one answer to the saved answers, keeping those other sessions saved meanwhile."""
+    with _canned_lock:
+        answers = _load_canned(version)
+        answers[query] = response
+        CANNED_PATH.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = CANNED_PATH.with_suffix(f'.{os.getpid()}.tmp')
+        with open(tmp_path, 'wb') as f:
+            pickle.dump({'version': version, 'answers': answers}, f)
+        os.replace(tmp_path, CANNED_PATH)
+
+@st.cache_data(show_spinner=False)
+def canned_response(query: str, version: tuple) -> dict:
+    """
+    Answer a quick question once for all sessions, reusing a saved answer on cold start.
+    
+    Args:
+        query: Quick question
+        version: corpus_version(), so that answers are recomputed once the
+            index or metadata database changes
+    """
+    response = _load_canned(version).get(query)
+    if response is None:
+        response = initialize_chatbot().answer_query(query)
+        if response['metadata']['finish_reason'] == 'error':
+            # Raised rather than returned, so the failure is not cached
+            raise RuntimeError(response['answer'])
+        _save_canned(version, query, response)
+    return response
+
+def stream_tokens(events, status):
+    """
+    Yield the answer text from chatbot.stream_answer events, for st.write_stream.
+    
+    Args:
+        events: Events from NextleapChatbot.stream_answer
+        status: Placeholder showing search progress, cleared once retrieval is done
+    """
+    for event in events:
+        if event['event'] == 'sources':
+            status.empty()
+        elif event['event'] == 'token':
+            yield event['content']
+        elif event['event'] == 'error':
+            raise RuntimeError(event['error'])
+
 # Initialize session state for chat history
 if "messages" not in st.session_state:
     st.session_state.messages = []
@@ -88,14 +178,9 @@ with st.sidebar:
     st.divider()
     
     st.header("Quick Questions")
-    if st.button("📖 What topics are covered?", use_container_width=True):
-        st.session_state.quick_query = "What topics are covered in the curriculum?"
-    if st.button("👨‍🏫 Who are the instructors?", use_container_width=True):
-        st.session_state.quick_query = "Who are the instructors?"
-    if st.button("📅 What is the class schedule?", use_container_width=True):
-        st.session_state.quick_query = "What is the class schedule?"
-    if st.button("💰 How much does it cost?", use_container_width=True):
-        st.session_state.quick_query = "How much does the course cost?"
+    for label, quick_query in QUICK_QUESTIONS:
+        if st.button(label, use_container_width=True):
+            st.session_state.quick_query = quick_query
     
     st.divider()
     
@@ -130,7 +215,8 @@ if "quick_query" in st.session_state:
     with st.chat_message("assistant"):
         with st.spinner("Thinking..."):
             try:
-                response = chatbot.answer_query(query)
+                # Shared, precomputed answer for the canned questions
+                response = canned_response(query, corpus_version())
                 answer = response['answer']
                 st.write(answer)
                 
@@ -148,20 +234,20 @@ if prompt := st.chat_input("Ask me anything about the PM Fellowship..."):
     with st.chat_message("user"):
         st.write(prompt)
     
-    # Get bot response
+    # Stream bot response: tokens are shown as the LLM produces them
     with st.chat_message("assistant"):
-        with st.spinner("Thinking..."):
-            try:
-                response = chatbot.answer_query(prompt)
-                answer = response['answer']
-                st.write(answer)
-                
-                # Add assistant message to history
-                st.session_state.messages.append({"role": "assistant", "content": answer})
-            except Exception as e:
-                error_msg = f"Sorry, I encountered an error: {str(e)}"
-                st.error(error_msg)
-                st.session_state.messages.append({"role": "assistant", "content": error_msg})
+        status = st.empty()
+        status.markdown("_Searching course materials…_")
+        try:
+            answer = st.write_stream(stream_tokens(chatbot.stream_answer(prompt), status))
+            
+            # Add assistant message to history
+            st.session_state.messages.append({"role": "assistant", "content": answer})
+        except Exception as e:
+            status.empty()
+            error_msg = f"Sorry, I encountered an error: {str(e)}"
+            st.error(error_msg)
+            st.session_state.messages.append({"role": "assistant", "content": error_msg})
 
 # Footer
 st.divider()
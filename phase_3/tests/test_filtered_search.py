@@ -0,0 +1,119 @@
+"""
+Unit tests for metadata-filtered vector search.
+"""
+import pytest
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'phase_2' / 'src'))
+
+from vector_db.chroma_client import FAISSVectorStore
+from metadata_store.sqlite_store import MetadataStore
+
+DIM = 16
+CATEGORIES = ("curriculum", "instructors", "tools")
+
+
+def make_chunks(count):
+    """Chunks cycling through CATEGORIES, curriculum ones with a week."""
+    chunks = []
+    for i in range(count):
+        category = CATEGORIES[i % len(CATEGORIES)]
+        metadata = {"category": category, "source": category}
+        if category == "curriculum":
+            metadata["week"] = i % 4 + 1
+        if category == "instructors":
+            metadata["instructor_name"] = f"Instructor {i % 2}"
+        chunks.append({"chunk_id": f"chunk_{i}", "content": f"content {i}", "metadata": metadata})
+    return chunks
+
+
+CHUNKS = make_chunks(60)
+METADATA = {chunk["chunk_id"]: chunk["metadata"] for chunk in CHUNKS}
+
+
+class TestFilteredSearch:
+    """Test suite for FAISSVectorStore filtered search."""
+    
+    @pytest.fixture
+    def store(self, tmp_path):
+        """Flat store of 60 chunks with a matching metadata store."""
+        metadata_db = MetadataStore(db_path=str(tmp_path / "metadata.db"))
+        store = FAISSVectorStore(
+            persist_directory=str(tmp_path / "vector_db"),
+            collection_name="test",
+            metadata_db=metadata_db
+        )
+        embeddings = np.random.RandomState(0).randn(len(CHUNKS), DIM).astype(np.float32)
+        metadata_db.add_chunks(CHUNKS)
+        store.add_chunks(CHUNKS, embeddings)
+        yield store
+        metadata_db.close()
+    
+    @pytest.fixture
+    def query_vectors(self):
+        """Five random queries."""
+        return np.random.RandomState(1).randn(5, DIM).astype(np.float32)
+    
+    @pytest.mark.parametrize("category", CATEGORIES)
+    def test_category_filter(self, store, query_vectors, category):
+        """Test that a category filter returns only (and enough) matching chunks."""
+        for hit in store.search_ids_batch(query_vectors, top_k=5, filter_metadata={"category": category}):
+            assert len(hit["ids"]) == 5
+            assert all(METADATA[chunk_id]["category"] == category for chunk_id in hit["ids"])
+    
+    def test_filtered_matches_brute_force(self, store, query_vectors):
+        """Test that filtering keeps the exact top-k among the matching chunks."""
+        unfiltered = store.search_ids_batch(query_vectors, top_k=60)
+        filtered = store.search_ids_batch(query_vectors, top_k=3, filter_metadata={"category": "tools"})
+        
+        for full, hit in zip(unfiltered, filtered):
+            expected = [chunk_id for chunk_id in full["ids"]
+                        if METADATA[chunk_id]["category"] == "tools"][:3]
+            assert hit["ids"] == expected
+    
+    def test_category_and_week_filter(self, store, query_vectors):
+        """Test a filter on both filter columns."""
+        hits = store.search_ids_batch(query_vectors, top_k=10, filter_metadata={"category": "curriculum", "week": 2})
+        
+        for hit in hits:
+            assert hit["ids"]
+            for chunk_id in hit["ids"]:
+                metadata = METADATA[chunk_id]
+                assert metadata["category"] == "curriculum" and metadata["week"] == 2
+    
+    def test_metadata_json_filter(self, store, query_vectors):
+        """Test a filter on a key only in the metadata JSON (resolved through SQLite)."""
+        hits = store.search_ids_batch(query_vectors, top_k=10, filter_metadata={"instructor_name": "Instructor 1"})
+        
+        for hit in hits:
+            assert hit["ids"]
+            assert all(
+                METADATA[chunk_id].get("instructor_name") == "Instructor 1"
+                for chunk_id in hit["ids"]
+            )
+    
+    def test_no_match_returns_empty(self, store, query_vectors):
+        """Test that a filter matching nothing returns no hits."""
+        for hit in store.search_ids_batch(query_vectors, top_k=5, filter_metadata={"category": "schedule"}):
+            assert hit["ids"] == [] and hit["similarities"] == []
+    
+    def test_per_query_filters(self, store, query_vectors):
+        """Test a batch with a different filter per query."""
+        filters = [{"category": "tools"}, None, {"category": "curriculum"}, {"category": "tools"}, None]
+        hits = store.search_ids_batch(query_vectors, top_k=4, filter_metadata=filters)
+        
+        for vector, filter_metadata, hit in zip(query_vectors, filters, hits):
+            assert hit == store.search_ids_batch(vector[None], top_k=4, filter_metadata=filter_metadata)[0]
+    
+    def test_filter_sees_added_chunks(self, store, query_vectors):
+        """Test that cached category selectors are rebuilt after add_chunks."""
+        store.search_ids_batch(query_vectors, top_k=5, filter_metadata={"category": "general"})
+        
+        chunk = {"chunk_id": "general_new", "content": "new", "metadata": {"category": "general", "source": "general"}}
+        store.metadata_db.add_chunks([chunk])
+        store.add_chunks([chunk], query_vectors[:1])
+        
+        hit = store.search_ids_batch(query_vectors[:1], top_k=5, filter_metadata={"category": "general"})[0]
+        assert hit["ids"] == ["general_new"]
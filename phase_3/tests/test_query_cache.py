@@ -0,0 +1,150 @@
+"""
+Unit tests for the query result cache.
+"""
+import pytest
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from retrieval import query_cache
+from retrieval.query_cache import QueryCache
+
+
+def unit(*values):
+    """float32 unit vector from values."""
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+class TestQueryCache:
+    """Test suite for QueryCache."""
+    
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        """Controllable time.monotonic for the cache module."""
+        now = [1000.0]
+        monkeypatch.setattr(query_cache.time, "monotonic", lambda: now[0])
+        return now
+    
+    def test_exact_get_and_put(self):
+        """Test exact-key lookups."""
+        cache = QueryCache(max_size=4)
+        assert cache.get("a") is None
+        
+        cache.put("a", [1])
+        assert cache.get("a") == [1]
+        assert len(cache) == 1
+        
+        cache.put("a", [2])
+        assert cache.get("a") == [2]
+        assert len(cache) == 1
+    
+    @pytest.mark.parametrize("max_size", [0, -1])
+    def test_disabled(self, max_size):
+        """Test that max_size <= 0 caches nothing."""
+        cache = QueryCache(max_size=max_size, similarity_threshold=0.95)
+        cache.put("a", "A", unit(1, 0, 0))
+        
+        assert cache.get("a") is None
+        assert cache.get("other", unit(1, 0, 0)) is None
+        assert len(cache) == 0
+    
+    def test_evicts_least_recently_used(self):
+        """Test that entries beyond max_size evict the least recently used."""
+        cache = QueryCache(max_size=2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", 3)
+        
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert len(cache) == 2
+    
+    def test_eviction_frees_embedding_slot(self):
+        """Test that an evicted entry no longer matches by embedding."""
+        cache = QueryCache(max_size=2, similarity_threshold=0.99)
+        cache.put("a", "A", unit(1, 0, 0))
+        cache.put("b", "B", unit(0, 1, 0))
+        cache.put("c", "C", unit(0, 0, 1))
+        
+        assert cache.get("other", unit(1, 0, 0)) is None
+        assert cache.get("other", unit(0, 0, 1)) == "C"
+    
+    def test_entries_expire(self, clock):
+        """Test that entries expire after ttl_seconds."""
+        cache = QueryCache(max_size=4, ttl_seconds=10.0)
+        cache.put("a", 1)
+        
+        clock[0] += 9.0
+        assert cache.get("a") == 1
+        
+        clock[0] += 1.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+    
+    def test_no_ttl_never_expires(self, clock):
+        """Test that ttl_seconds=None keeps entries until evicted."""
+        cache = QueryCache(max_size=4, ttl_seconds=None)
+        cache.put("a", 1)
+        
+        clock[0] += 1e9
+        assert cache.get("a") == 1
+    
+    def test_near_duplicate_match(self):
+        """Test embedding fallback at and below the similarity threshold."""
+        cache = QueryCache(max_size=4, similarity_threshold=0.95)
+        cache.put("a", "A", unit(1, 0, 0))
+        
+        assert cache.get("other", unit(1, 0.1, 0)) == "A"  # cosine ~0.995
+        assert cache.get("other", unit(1, 1, 0)) is None  # cosine ~0.707
+        assert cache.get("other") is None
+    
+    def test_exact_only_without_threshold(self):
+        """Test that similarity_threshold=None never matches by embedding."""
+        cache = QueryCache(max_size=4)
+        cache.put("a", "A", unit(1, 0, 0))
+        
+        assert cache.get("other", unit(1, 0, 0)) is None
+    
+    def test_scope_isolation(self):
+        """Test that embeddings only match entries stored under the same scope."""
+        cache = QueryCache(max_size=4, similarity_threshold=0.95)
+        cache.put("a", "curriculum result", unit(1, 0, 0), scope="curriculum")
+        
+        assert cache.get("other", unit(1, 0, 0), scope="curriculum") == "curriculum result"
+        assert cache.get("other", unit(1, 0, 0), scope="tools") is None
+        assert cache.get("other", unit(1, 0, 0)) is None
+        
+        cache.put("b", "unfiltered result", unit(1, 0, 0))
+        assert cache.get("other", unit(1, 0, 0)) == "unfiltered result"
+        assert cache.get("other", unit(1, 0, 0), scope="curriculum") == "curriculum result"
+    
+    def test_clear(self):
+        """Test that clear() drops exact and embedding entries."""
+        cache = QueryCache(max_size=4, similarity_threshold=0.95)
+        cache.put("a", "A", unit(1, 0, 0))
+        cache.put("b", "B")
+        
+        cache.clear()
+        
+        assert len(cache) == 0
+        assert cache.get("a") is None
+        assert cache.get("other", unit(1, 0, 0)) is None
+        
+        # Still usable afterwards
+        cache.put("c", "C", unit(0, 1, 0))
+        assert cache.get("other", unit(0, 1, 0)) == "C"
+    
+    def test_embedding_key(self):
+        """Test that keys depend on the embedding bytes and the extra parts."""
+        vector = unit(1, 2, 3)
+        
+        assert QueryCache.embedding_key(vector) == QueryCache.embedding_key(vector.copy())
+        assert QueryCache.embedding_key(vector, "tools") != QueryCache.embedding_key(vector)
+        assert QueryCache.embedding_key(vector) != QueryCache.embedding_key(unit(3, 2, 1))
+        # A [1, dim] row hashes the same as the vector
+        assert QueryCache.embedding_key(vector.reshape(1, -1)) == QueryCache.embedding_key(vector)
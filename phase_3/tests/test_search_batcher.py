@@ -0,0 +1,143 @@
+"""
+Unit tests for the search batcher.
+"""
+import os
+import signal
+import threading
+import pytest
+import numpy as np
+
+import sys
+from pathlib import Path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from retrieval.search_batcher import SearchBatcher
+
+
+class FakeRetriever:
+    """Retriever stand-in: each query's "chunks" name its first component and filter."""
+    
+    def __init__(self, cached=None):
+        self.cached = cached or {}
+        self.batches = []
+        self.lock = threading.Lock()
+    
+    @staticmethod
+    def result(vector, category):
+        return [{"query": int(vector[0]), "category": category}]
+    
+    def cached_results(self, query_vectors, category_filters):
+        return [self.cached.get(int(vector[0])) for vector in query_vectors]
+    
+    def retrieve_batch(self, query_vectors, category_filters):
+        with self.lock:
+            self.batches.append([int(vector[0]) for vector in query_vectors])
+        return [self.result(vector, category) for vector, category in zip(query_vectors, category_filters)]
+
+
+def queries(*ids):
+    """[len(ids), 4] float32 queries whose first component is the query id."""
+    vectors = np.zeros((len(ids), 4), dtype=np.float32)
+    vectors[:, 0] = ids
+    return vectors
+
+
+class TestSearchBatcher:
+    """Test suite for SearchBatcher."""
+    
+    def test_single_caller(self):
+        """Test that one caller gets its results in order, with its filters."""
+        retriever = FakeRetriever()
+        batcher = SearchBatcher(retriever, max_batch=8, max_wait_ms=1.0)
+        
+        results = batcher.retrieve_batch(queries(1, 2, 3), ["tools", None, "curriculum"])
+        
+        assert results == [
+            FakeRetriever.result([1], "tools"),
+            FakeRetriever.result([2], None),
+            FakeRetriever.result([3], "curriculum"),
+        ]
+    
+    def test_shared_filter(self):
+        """Test that a single category filter applies to every query."""
+        batcher = SearchBatcher(FakeRetriever(), max_wait_ms=1.0)
+        
+        results = batcher.retrieve_batch(queries(1, 2), "tools")
+        
+        assert [chunks[0]["category"] for chunks in results] == ["tools", "tools"]
+    
+    def test_concurrent_callers_get_their_own_rows(self):
+        """Test result routing when concurrent calls are coalesced."""
+        retriever = FakeRetriever()
+        batcher = SearchBatcher(retriever, max_batch=64, max_wait_ms=50.0)
+        results = {}
+        start = threading.Barrier(8)
+        
+        def worker(n):
+            ids = (10 * n, 10 * n + 1)
+            start.wait()
+            results[n] = batcher.retrieve_batch(queries(*ids), f"cat{n}")
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        for n in range(8):
+            assert results[n] == [
+                FakeRetriever.result([10 * n], f"cat{n}"),
+                FakeRetriever.result([10 * n + 1], f"cat{n}"),
+            ]
+        # Every query searched exactly once, in fewer calls than callers
+        searched = sorted(query for batch in retriever.batches for query in batch)
+        assert searched == sorted(q for n in range(8) for q in (10 * n, 10 * n + 1))
+        assert len(retriever.batches) < 8
+    
+    def test_cache_hits_are_not_queued(self):
+        """Test that cached queries are answered without a search."""
+        retriever = FakeRetriever(cached={2: ["cached two"]})
+        batcher = SearchBatcher(retriever, max_wait_ms=1.0)
+        
+        results = batcher.retrieve_batch(queries(1, 2, 3))
+        
+        assert results == [FakeRetriever.result([1], None), ["cached two"], FakeRetriever.result([3], None)]
+        assert retriever.batches == [[1, 3]]
+        
+        retriever.cached = {1: ["one"], 3: ["three"]}
+        assert batcher.retrieve_batch(queries(1, 3)) == [["one"], ["three"]]
+        assert retriever.batches == [[1, 3]]
+    
+    def test_errors_reach_every_caller(self):
+        """Test that a failed batched search raises in its callers."""
+        retriever = FakeRetriever()
+        
+        def fail(query_vectors, category_filters):
+            raise RuntimeError("search failed")
+        
+        retriever.retrieve_batch = fail
+        batcher = SearchBatcher(retriever, max_wait_ms=1.0)
+        
+        with pytest.raises(RuntimeError, match="search failed"):
+            batcher.retrieve_batch(queries(1))
+    
+    @pytest.mark.skipif(not hasattr(os, "fork"), reason="needs os.fork")
+    def test_search_after_fork(self):
+        """Test that a batcher built before fork() still searches in the child."""
+        batcher = SearchBatcher(FakeRetriever(), max_wait_ms=1.0)
+        assert batcher.retrieve_batch(queries(1)) == [FakeRetriever.result([1], None)]
+        
+        pid = os.fork()
+        if pid == 0:
+            # Child: a hung search exits via SIGALRM with a non-zero status
+            signal.alarm(5)
+            ok = False
+            try:
+                ok = batcher.retrieve_batch(queries(2), "tools") == [FakeRetriever.result([2], "tools")]
+            finally:
+                os._exit(0 if ok else 1)
+        
+        _, status = os.waitpid(pid, 0)
+        assert os.WIFEXITED(status) and os.WEXITSTATUS(status) == 0
+        # The parent's consumer keeps working too
+        assert batcher.retrieve_batch(queries(3)) == [FakeRetriever.result([3], None)]